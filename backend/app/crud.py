@@ -1,12 +1,41 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
 
 from . import models
 
 
-def get_or_create_item(db: Session, nome: str, eh_basico: bool = False) -> models.Item:
+REVISION_ROW_ID = 1
+
+
+def ensure_revision_row(db: Session) -> None:
+    """Cria a linha de revisão; chamada uma vez na inicialização, com a sessão síncrona."""
+    if db.get(models.GraphRevision, REVISION_ROW_ID) is None:
+        db.add(models.GraphRevision(id=REVISION_ROW_ID, revisao=0))
+        db.commit()
+
+
+async def get_revision(db: AsyncSession) -> int:
+    """Revisão atual do grafo (consulta a uma única linha, sem tocar nas receitas)."""
+    revisao = await db.scalar(
+        select(models.GraphRevision.revisao).where(models.GraphRevision.id == REVISION_ROW_ID)
+    )
+    return revisao or 0
+
+
+async def bump_revision(db: AsyncSession) -> None:
+    """Incrementa a revisão na mesma transação da escrita (vale após o commit)."""
+    await db.execute(
+        update(models.GraphRevision)
+        .where(models.GraphRevision.id == REVISION_ROW_ID)
+        .values(revisao=models.GraphRevision.revisao + 1)
+    )
+
+
+async def get_or_create_item(db: AsyncSession, nome: str, eh_basico: bool = False) -> models.Item:
     nome_norm = nome.strip()
-    item = db.query(models.Item).filter(models.Item.nome == nome_norm).first()
+    item = await db.scalar(select(models.Item).where(models.Item.nome == nome_norm))
     if item:
         if eh_basico and not item.eh_basico:
             item.eh_basico = True
@@ -14,50 +43,313 @@ def get_or_create_item(db: Session, nome: str, eh_basico: bool = False) -> model
         return item
     item = models.Item(nome=nome_norm, eh_basico=eh_basico)
     db.add(item)
-    db.flush()
+    await db.flush()
     return item
 
 
-def list_items(db: Session) -> List[models.Item]:
-    return db.query(models.Item).order_by(models.Item.nome.asc()).all()
+async def list_items(db: AsyncSession) -> List[models.Item]:
+    return list(await db.scalars(select(models.Item).order_by(models.Item.nome.asc())))
 
 
-def create_recipe(
-    db: Session,
+def _recipe_options():
+    # Sessão assíncrona não faz lazy load: relações carregadas na consulta
+    return (
+        joinedload(models.Receita.resultado_item),
+        selectinload(models.Receita.ingredientes).joinedload(models.IngredienteReceita.item),
+    )
+
+
+async def create_recipe(
+    db: AsyncSession,
     resultado_nome: str,
     quantidade_resultado: int,
     ingredientes: List[tuple],  # (nome, quantidade)
 ) -> models.Receita:
-    resultado_item = get_or_create_item(db, resultado_nome)
+    resultado_item = await get_or_create_item(db, resultado_nome)
     receita = models.Receita(
         resultado_item=resultado_item,
         quantidade_resultado=quantidade_resultado,
     )
     db.add(receita)
-    db.flush()
+    await db.flush()
 
     for nome, qtd in ingredientes:
-        item = get_or_create_item(db, nome)
+        item = await get_or_create_item(db, nome)
         db.add(
             models.IngredienteReceita(
                 receita=receita, item=item, quantidade=int(qtd)
             )
         )
-    db.flush()
+    await db.flush()
     return receita
 
 
-def list_recipes(db: Session) -> List[models.Receita]:
-    return db.query(models.Receita).all()
+async def get_recipe(db: AsyncSession, receita_id: int) -> Optional[models.Receita]:
+    return await db.scalar(
+        select(models.Receita)
+        .where(models.Receita.id == receita_id)
+        .options(*_recipe_options())
+        .execution_options(populate_existing=True)
+    )
 
 
-def graph_data(db: Session):
-    items = list_items(db)
-    nodes = [{"id": i.nome, "label": i.nome, "eh_basico": i.eh_basico} for i in items]
-    edges = []
-    for r in list_recipes(db):
-        for ing in r.ingredientes:
-            edges.append((ing.item.nome, r.resultado_item.nome))
-    return nodes, edges
+# Limite de nomes por cláusula IN (SQLite aceita até 32766 parâmetros)
+BULK_IN_CHUNK = 5000
+
+
+async def resolve_items_bulk(db: AsyncSession, nomes: Dict[str, bool]) -> Tuple[Dict[str, int], int]:
+    """
+    Resolve vários itens de uma vez: (nome -> id, quantidade de itens criados).
+
+    ``nomes`` mapeia nome normalizado -> eh_basico. Os existentes são lidos
+    com uma consulta IN (por bloco de BULK_IN_CHUNK nomes) e os faltantes
+    são inseridos em um único executemany.
+    """
+    ids: Dict[str, int] = {}
+    promover: List[int] = []
+    lista = list(nomes)
+    for i in range(0, len(lista), BULK_IN_CHUNK):
+        bloco = lista[i:i + BULK_IN_CHUNK]
+        rows = await db.execute(
+            select(models.Item.id, models.Item.nome, models.Item.eh_basico)
+            .where(models.Item.nome.in_(bloco))
+        )
+        for item_id, nome, eh_basico in rows:
+            ids[nome] = item_id
+            if nomes[nome] and not eh_basico:
+                promover.append(item_id)
+
+    if promover:
+        await db.execute(
+            update(models.Item)
+            .where(models.Item.id.in_(promover))
+            .values(eh_basico=True)
+            .execution_options(synchronize_session=False)
+        )
+
+    novos = [{"nome": nome, "eh_basico": eh_basico} for nome, eh_basico in nomes.items() if nome not in ids]
+    if novos:
+        rows = await db.execute(
+            insert(models.Item).returning(models.Item.id, models.Item.nome),
+            novos,
+        )
+        for item_id, nome in rows:
+            ids[nome] = item_id
+    return ids, len(novos)
+
+
+async def create_recipes_bulk(
+    db: AsyncSession,
+    itens: List[tuple],  # (nome, eh_basico)
+    receitas: List[tuple],  # (resultado_nome, quantidade_resultado, [(nome, quantidade)])
+) -> Dict[str, int]:
+    """
+    Importa itens e receitas em lote, sem commit.
+
+    Todos os nomes são resolvidos de uma vez (resolve_items_bulk); receitas
+    e ingredientes são inseridos com executemany. Ingredientes repetidos
+    na mesma receita têm as quantidades somadas. Levanta ValueError, antes
+    de qualquer inserção, se alguma quantidade for menor que 1.
+    """
+    for resultado_nome, qtd_resultado, ingredientes in receitas:
+        if qtd_resultado < 1 or any(qtd < 1 for _, qtd in ingredientes):
+            raise ValueError(f"Receita de '{resultado_nome}' com quantidade menor que 1")
+
+    nomes: Dict[str, bool] = {}
+    for nome, eh_basico in itens:
+        nome_norm = nome.strip()
+        nomes[nome_norm] = nomes.get(nome_norm, False) or eh_basico
+    for resultado_nome, _, ingredientes in receitas:
+        nomes.setdefault(resultado_nome.strip(), False)
+        for nome, _ in ingredientes:
+            nomes.setdefault(nome.strip(), False)
+
+    ids, itens_criados = await resolve_items_bulk(db, nomes)
+
+    receita_ids: List[int] = []
+    if receitas:
+        receita_ids = list(
+            await db.scalars(
+                insert(models.Receita).returning(models.Receita.id, sort_by_parameter_order=True),
+                [
+                    {"resultado_id": ids[resultado_nome.strip()], "quantidade_resultado": int(qtd_resultado)}
+                    for resultado_nome, qtd_resultado, _ in receitas
+                ],
+            )
+        )
+
+    linhas = []
+    for receita_id, (_, _, ingredientes) in zip(receita_ids, receitas):
+        quantidades: Dict[int, int] = {}
+        for nome, qtd in ingredientes:
+            item_id = ids[nome.strip()]
+            quantidades[item_id] = quantidades.get(item_id, 0) + int(qtd)
+        linhas.extend(
+            {"receita_id": receita_id, "item_id": item_id, "quantidade": qtd}
+            for item_id, qtd in quantidades.items()
+        )
+    if linhas:
+        await db.execute(insert(models.IngredienteReceita), linhas)
+
+    return {"itens_criados": itens_criados, "receitas_criadas": len(receita_ids)}
+
+
+async def list_recipes(db: AsyncSession) -> List[models.Receita]:
+    return list(
+        await db.scalars(
+            select(models.Receita).options(*_recipe_options()).order_by(models.Receita.id.asc())
+        )
+    )
+
 
+# Linhas buscadas por vez ao percorrer o cursor nos endpoints de streaming
+STREAM_BATCH = 1000
 
+
+async def item_rows(db: AsyncSession) -> List[tuple]:
+    """(nome, eh_basico) de todos os itens, em uma única consulta."""
+    rows = await db.execute(
+        select(models.Item.nome, models.Item.eh_basico).order_by(models.Item.nome.asc())
+    )
+    return rows.all()
+
+
+def _item_rows_by_id():
+    return select(models.Item.id, models.Item.nome, models.Item.eh_basico).order_by(models.Item.id.asc())
+
+
+async def item_rows_page(db: AsyncSession, after_id: int, limit: int) -> List[tuple]:
+    """Página (keyset) de itens: (id, nome, eh_basico) com id > after_id."""
+    rows = await db.execute(_item_rows_by_id().where(models.Item.id > after_id).limit(limit))
+    return rows.all()
+
+
+async def iter_item_rows(db: AsyncSession):
+    """Itens (id, nome, eh_basico) lidos do cursor em blocos de STREAM_BATCH."""
+    async for row in await db.stream(_item_rows_by_id().execution_options(yield_per=STREAM_BATCH)):
+        yield row
+
+
+def _recipe_rows_query():
+    resultado = aliased(models.Item)
+    ingrediente = aliased(models.Item)
+    return (
+        select(
+            models.Receita.id,
+            resultado.nome,
+            models.Receita.quantidade_resultado,
+            ingrediente.nome,
+            models.IngredienteReceita.quantidade,
+        )
+        .join(resultado, models.Receita.resultado_id == resultado.id)
+        .outerjoin(models.IngredienteReceita, models.IngredienteReceita.receita_id == models.Receita.id)
+        .outerjoin(ingrediente, models.IngredienteReceita.item_id == ingrediente.id)
+        .order_by(models.Receita.id.asc(), models.IngredienteReceita.id.asc())
+    )
+
+
+async def recipe_rows(db: AsyncSession) -> List[tuple]:
+    """
+    Projeção plana das receitas em uma única consulta (sem lazy loads).
+
+    Cada linha é (receita_id, resultado_nome, quantidade_resultado,
+    ingrediente_nome, quantidade); receitas sem ingredientes aparecem
+    uma vez com ingrediente None.
+    """
+    rows = await db.execute(_recipe_rows_query())
+    return rows.all()
+
+
+async def recipe_rows_page(db: AsyncSession, after_id: int, limit: int) -> List[tuple]:
+    """
+    Linhas de recipe_rows das próximas ``limit`` receitas com id > after_id.
+
+    Uma consulta encontra o intervalo de ids da página e outra traz as
+    linhas desse intervalo.
+    """
+    ids = list(
+        await db.scalars(
+            select(models.Receita.id)
+            .where(models.Receita.id > after_id)
+            .order_by(models.Receita.id.asc())
+            .limit(limit)
+        )
+    )
+    if not ids:
+        return []
+    rows = await db.execute(
+        _recipe_rows_query().where(models.Receita.id >= ids[0], models.Receita.id <= ids[-1])
+    )
+    return rows.all()
+
+
+async def iter_recipe_rows(db: AsyncSession):
+    """Linhas de recipe_rows lidas do cursor em blocos de STREAM_BATCH."""
+    async for row in await db.stream(_recipe_rows_query().execution_options(yield_per=STREAM_BATCH)):
+        yield row
+
+
+def _edge_rows_query():
+    resultado = aliased(models.Item)
+    ingrediente = aliased(models.Item)
+    return (
+        select(models.IngredienteReceita.id, ingrediente.nome, resultado.nome)
+        .join(ingrediente, models.IngredienteReceita.item_id == ingrediente.id)
+        .join(models.Receita, models.IngredienteReceita.receita_id == models.Receita.id)
+        .join(resultado, models.Receita.resultado_id == resultado.id)
+        .order_by(models.IngredienteReceita.id.asc())
+    )
+
+
+async def edge_rows_page(db: AsyncSession, after_id: int, limit: int) -> List[tuple]:
+    """Página (keyset) de arestas: (id, ingrediente, resultado) com id > after_id."""
+    rows = await db.execute(_edge_rows_query().where(models.IngredienteReceita.id > after_id).limit(limit))
+    return rows.all()
+
+
+async def iter_edge_rows(db: AsyncSession):
+    """Arestas (id, ingrediente, resultado) lidas do cursor em blocos de STREAM_BATCH."""
+    async for row in await db.stream(_edge_rows_query().execution_options(yield_per=STREAM_BATCH)):
+        yield row
+
+
+def group_recipe_rows(rows):
+    """Agrupa linhas de recipe_rows em (id, resultado, qtd_resultado, [(nome, qtd)]), sob demanda."""
+    atual = None
+    for receita_id, resultado_nome, qtd_resultado, ing_nome, ing_qtd in rows:
+        if atual is None or atual[0] != receita_id:
+            if atual is not None:
+                yield atual
+            atual = (receita_id, resultado_nome, qtd_resultado, [])
+        if ing_nome is not None:
+            atual[3].append((ing_nome, ing_qtd))
+    if atual is not None:
+        yield atual
+
+
+async def agroup_recipe_rows(rows):
+    """Versão de group_recipe_rows para linhas vindas de um cursor assíncrono."""
+    atual = None
+    async for receita_id, resultado_nome, qtd_resultado, ing_nome, ing_qtd in rows:
+        if atual is None or atual[0] != receita_id:
+            if atual is not None:
+                yield atual
+            atual = (receita_id, resultado_nome, qtd_resultado, [])
+        if ing_nome is not None:
+            atual[3].append((ing_nome, ing_qtd))
+    if atual is not None:
+        yield atual
+
+
+async def list_recipe_tuples(db: AsyncSession) -> List[tuple]:
+    return list(group_recipe_rows(await recipe_rows(db)))
+
+
+async def graph_data(db: AsyncSession):
+    nodes = [{"id": nome, "label": nome, "eh_basico": eh_basico} for nome, eh_basico in await item_rows(db)]
+    edges = [
+        (ing_nome, resultado_nome)
+        for _, resultado_nome, _, ing_nome, _ in await recipe_rows(db)
+        if ing_nome is not None
+    ]
+    return nodes, edges
@@ -0,0 +1,176 @@
+"""
+Execução dos endpoints de algoritmos em um pool de processos.
+
+Por padrão os algoritmos rodam na thread do próprio request, disputando o
+GIL com o resto do servidor. Com ``ALGORITHM_WORKERS=N`` (N > 0) eles são
+enviados a um pool de N processos. O snapshot do grafo é publicado uma
+vez por revisão em ``multiprocessing.shared_memory`` como vetores planos
+(ver ``crafting.congelado.vetores``): o CSR nas duas direções, com pesos,
+a tabela de nomes, as receitas e os índices de usos e de receitas por
+resultado. Os workers mapeiam esse bloco e rodam os algoritmos direto
+sobre ele com um ``SistemaCongelado``, sem cópia e sem remontar itens,
+receitas ou a Lista de Adjacência; por worker só ficam a tabela de nomes
+(decodificada uma vez por revisão) e as memoizações dos algoritmos.
+"""
+
+import functools
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from crafting.congelado import SistemaCongelado, vetores
+from crafting.system import SistemaCrafting
+
+from .metrics import fase
+from .snapshot import GraphSnapshot
+
+
+ALGORITHM_WORKERS = int(os.getenv("ALGORITHM_WORKERS", "0") or 0)
+
+# Seções do bloco: nome -> (deslocamento em bytes, typecode, elementos)
+Layout = Dict[str, Tuple[int, str, int]]
+
+
+# --- Serialização do snapshot ----------------------------------------------
+
+def publicar(sistema: SistemaCrafting) -> Tuple[SharedMemory, Layout]:
+    """Copia os vetores do sistema para um novo bloco de memória compartilhada."""
+    secoes = vetores(sistema)
+    layout: Layout = {}
+    tamanho = 0
+    for nome, vetor in secoes.items():
+        tamanho = (tamanho + 7) & ~7  # alinhamento de 8 bytes
+        layout[nome] = (tamanho, vetor.typecode, len(vetor))
+        tamanho += len(vetor) * vetor.itemsize
+
+    shm = SharedMemory(create=True, size=max(tamanho, 1))
+    for nome, vetor in secoes.items():
+        inicio = layout[nome][0]
+        dados = vetor.tobytes()
+        shm.buf[inicio:inicio + len(dados)] = dados
+    return shm, layout
+
+
+def _vetor(buf: memoryview, layout: Layout, nome: str) -> memoryview:
+    inicio, tipo, total = layout[nome]
+    tamanho = total * array(tipo).itemsize
+    return buf[inicio:inicio + tamanho].cast(tipo)
+
+
+def montar(buf: memoryview, layout: Layout) -> SistemaCongelado:
+    """
+    Sistema somente leitura sobre um bloco publicado. Todos os vetores
+    (CSR, receitas, usos) apontam direto para o bloco; só a tabela de
+    nomes é decodificada no worker.
+    """
+    return SistemaCongelado({nome: _vetor(buf, layout, nome) for nome in layout})
+
+
+# --- Lado do worker ----------------------------------------------------------
+
+_no_worker = False
+_anexado: Optional[Tuple[str, SharedMemory, GraphSnapshot]] = None
+
+
+def _iniciar_worker():
+    global _no_worker
+    _no_worker = True
+
+
+def _snapshot_do_bloco(nome_bloco: str, layout: Layout, revisao: int) -> GraphSnapshot:
+    global _anexado
+    if _anexado is not None and _anexado[0] == nome_bloco:
+        return _anexado[2]
+
+    # Os workers compartilham o resource tracker do processo principal,
+    # que é quem cria e remove (unlink) os blocos
+    shm = SharedMemory(name=nome_bloco)
+    snapshot = GraphSnapshot(montar(shm.buf, layout), revisao)
+
+    anterior, _anexado = _anexado, (nome_bloco, shm, snapshot)
+    if anterior is not None:
+        try:
+            anterior[1].close()
+        except BufferError:
+            pass  # ainda há views vivas; o mapeamento sai com o coletor
+    return snapshot
+
+
+def _executar(funcao, req, parametros, nome_bloco: str, layout: Layout, revisao: int):
+    snapshot = _snapshot_do_bloco(nome_bloco, layout, revisao)
+    try:
+        return True, funcao(req, snapshot=snapshot, **parametros)
+    except HTTPException as e:
+        return False, (e.status_code, e.detail)
+
+
+# --- Lado do processo principal ------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+# Blocos publicados, do mais novo ao mais antigo: (revisão, bloco, layout).
+# O anterior ao atual é mantido para tarefas que ainda vão anexá-lo.
+_blocos = []
+
+
+def _bloco_atual(snapshot: GraphSnapshot):
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=ALGORITHM_WORKERS,
+                mp_context=get_context("spawn"),
+                initializer=_iniciar_worker,
+            )
+        if not _blocos or _blocos[0][0] < snapshot.revisao:
+            shm, layout = publicar(snapshot.sistema)
+            _blocos.insert(0, (snapshot.revisao, shm, layout))
+            for _, antigo, _ in _blocos[2:]:
+                antigo.close()
+                antigo.unlink()
+            del _blocos[2:]
+        revisao, shm, layout = _blocos[0]
+        return _pool, shm.name, layout, revisao
+
+
+def em_processo(funcao):
+    """
+    Envia o endpoint ao pool de processos quando ``ALGORITHM_WORKERS`` > 0.
+
+    O endpoint recebe o corpo ``req``, o ``snapshot`` e eventuais
+    parâmetros de query, e deve devolver algo serializável (pickle).
+    ``HTTPException`` levantada no worker é levantada de novo aqui.
+    """
+    @functools.wraps(funcao)
+    def executar(req, snapshot: GraphSnapshot, **parametros):
+        with fase("algorithm"):
+            if ALGORITHM_WORKERS <= 0 or _no_worker:
+                return funcao(req, snapshot=snapshot, **parametros)
+            pool, nome_bloco, layout, revisao = _bloco_atual(snapshot)
+            tarefa = pool.submit(_executar, executar, req, parametros, nome_bloco, layout, revisao)
+            ok, resultado = tarefa.result()
+        if not ok:
+            status, detalhe = resultado
+            raise HTTPException(status_code=status, detail=detalhe)
+        return resultado
+
+    return executar
+
+
+def encerrar():
+    """Finaliza o pool e remove os blocos publicados."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+        for _, shm, _ in _blocos:
+            shm.close()
+            shm.unlink()
+        _blocos.clear()
@@ -0,0 +1,86 @@
+"""
+Respostas JSON condicionais, baseadas na revisão do grafo.
+
+Cada corpo é serializado uma vez por revisão e guardado em memória. O
+ETag é a própria revisão: quando o cliente envia ``If-None-Match`` com a
+revisão atual, a resposta é um 304 sem corpo e sem consultar as tabelas
+de itens e receitas.
+"""
+
+import json
+import threading
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from .metrics import fase
+
+
+_bodies: Dict[str, Tuple[int, bytes]] = {}
+_lock = threading.Lock()
+
+
+def revision_etag(revisao: int) -> str:
+    return f'"rev-{revisao}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    valor = request.headers.get("if-none-match")
+    if not valor:
+        return False
+    for candidato in valor.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato in (etag, "*"):
+            return True
+    return False
+
+
+def revision_headers(revisao: int) -> Dict[str, str]:
+    """Cabeçalhos de cache de uma resposta da revisão dada."""
+    return {"ETag": revision_etag(revisao), "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, revisao: int) -> Optional[Response]:
+    """304 se o cliente já tem a revisão atual (``If-None-Match``), senão None."""
+    if _etag_matches(request, revision_etag(revisao)):
+        return Response(status_code=304, headers=revision_headers(revisao))
+    return None
+
+
+async def cached_json_response(
+    request: Request,
+    revisao: int,
+    chave: str,
+    construir: Callable[[], Awaitable[object]],
+) -> Response:
+    """
+    Resposta de ``await construir()`` para a revisão dada, com ETag.
+
+    ``construir`` só é chamado quando o corpo dessa revisão ainda não
+    está em cache; ``chave`` identifica o endpoint.
+    """
+    resposta = not_modified(request, revisao)
+    if resposta is not None:
+        return resposta
+
+    em_cache = _bodies.get(chave)
+    if em_cache is not None and em_cache[0] == revisao:
+        corpo = em_cache[1]
+    else:
+        dados = await construir()
+        with fase("serialization"):
+            corpo = json.dumps(
+                jsonable_encoder(dados),
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        with _lock:
+            anterior = _bodies.get(chave)
+            if anterior is None or anterior[0] <= revisao:
+                _bodies[chave] = (revisao, corpo)
+
+    return Response(content=corpo, media_type="application/json", headers=revision_headers(revisao))
@@ -1,12 +1,23 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from .routers import items, recipes, graph, algorithms
-from .database import Base, engine
+from .database import Base, SessionLocal, async_engine, engine
+from .metrics import MetricsMiddleware, instrumentar_engine, registro
+from . import crud, executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Pool de processos e memória compartilhada dos algoritmos, se ativos
+    executor.encerrar()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Crafting API", version="1.0.0")
+    app = FastAPI(title="Crafting API", version="1.0.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -14,9 +25,15 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "Server-Timing"],
     )
+    # Adicionado por último: é o mais externo e mede também o CORS
+    app.add_middleware(MetricsMiddleware)
+    instrumentar_engine(async_engine.sync_engine)
 
     Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        crud.ensure_revision_row(db)
 
     app.include_router(items.router, prefix="/items", tags=["items"])
     app.include_router(recipes.router, prefix="/recipes", tags=["recipes"])
@@ -27,6 +44,10 @@ def create_app() -> FastAPI:
     def root():
         return {"status": "ok"}
 
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     return app
 
 
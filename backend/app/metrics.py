@@ -0,0 +1,281 @@
+"""
+Métricas por requisição: latência por rota, requisições em andamento,
+consultas ao banco e tempo gasto em cada fase.
+
+O ``MetricsMiddleware`` abre uma ``Medicao`` para cada requisição HTTP e a
+deixa em uma contextvar. As fases são registradas com ``fase(nome)``
+(ex.: ``snapshot``, ``algorithm``, ``serialization``) e as consultas SQL
+por eventos da engine (``instrumentar_engine``). Ao fim da requisição os
+valores vão para o registro do processo, exposto em formato texto do
+Prometheus por ``GET /metrics``, e a resposta recebe um cabeçalho
+``Server-Timing`` com a duração de cada fase.
+
+As fases podem se sobrepor (as consultas da montagem do snapshot contam
+em ``db`` e em ``snapshot``). Cada processo tem o seu registro: com
+vários workers do uvicorn, cada scrape vê o worker que o atendeu.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+
+# Limites (em segundos) do histograma de latência
+FAIXAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites do histograma de consultas ao banco por requisição
+FAIXAS_CONSULTAS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+# Rótulo das requisições que não casaram com nenhuma rota (evita um rótulo por URL)
+ROTA_DESCONHECIDA = "unmatched"
+
+
+class Medicao:
+    """Fases e consultas ao banco de uma requisição."""
+
+    def __init__(self):
+        self.fases: Dict[str, float] = {}
+        self.consultas = 0
+        # Fases em andamento: uma fase aninhada nela mesma só conta uma vez
+        self.abertas: Set[str] = set()
+
+    def adicionar(self, fase: str, segundos: float):
+        self.fases[fase] = self.fases.get(fase, 0.0) + segundos
+
+    def server_timing(self, total: float) -> str:
+        partes = []
+        for nome, segundos in self.fases.items():
+            parte = f"{nome};dur={segundos * 1000:.2f}"
+            if nome == "db":
+                parte += f';desc="{self.consultas} consultas"'
+            partes.append(parte)
+        partes.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(partes)
+
+
+_medicao: ContextVar[Optional[Medicao]] = ContextVar("medicao", default=None)
+
+
+@contextmanager
+def fase(nome: str):
+    """
+    Soma o tempo do bloco à fase ``nome`` da requisição atual, se houver.
+    Só a chamada mais externa de cada fase é medida (por exemplo, um
+    algoritmo chamado de dentro de ``/algorithms/batch``).
+    """
+    medicao = _medicao.get()
+    if medicao is None or nome in medicao.abertas:
+        yield
+        return
+    medicao.abertas.add(nome)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicao.abertas.discard(nome)
+        medicao.adicionar(nome, time.perf_counter() - inicio)
+
+
+# --- Consultas ao banco ----------------------------------------------------
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_inicio", []).append(time.perf_counter())
+
+
+def _fim_da_consulta(conn):
+    inicios = conn.info.get("metrics_inicio")
+    if not inicios:
+        return
+    inicio = inicios.pop()
+    medicao = _medicao.get()
+    if medicao is not None:
+        medicao.consultas += 1
+        medicao.adicionar("db", time.perf_counter() - inicio)
+
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    _fim_da_consulta(conn)
+
+
+def _erro_na_consulta(contexto):
+    # Sem after_cursor_execute quando a consulta falha: o início é
+    # descartado aqui (e a consulta conta) para não acumular em conn.info
+    if contexto.connection is not None:
+        _fim_da_consulta(contexto.connection)
+
+
+def instrumentar_engine(engine):
+    """
+    Conta as consultas e o tempo de banco de cada requisição. Aceita uma
+    engine síncrona (para a assíncrona, passe ``async_engine.sync_engine``).
+    """
+    if not event.contains(engine, "before_cursor_execute", _antes_da_consulta):
+        event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+        event.listen(engine, "after_cursor_execute", _depois_da_consulta)
+        event.listen(engine, "handle_error", _erro_na_consulta)
+
+
+# --- Registro e formato do Prometheus --------------------------------------
+
+class _Histograma:
+    def __init__(self, faixas):
+        self.faixas = faixas
+        self.contagens = [0] * (len(faixas) + 1)
+        self.soma = 0.0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.faixas):
+            if valor <= limite:
+                break
+        else:
+            i = len(self.faixas)
+        self.contagens[i] += 1
+        self.soma += valor
+
+
+def _rotulos(**rotulos) -> str:
+    pares = []
+    for chave, valor in rotulos.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pares.append(f'{chave}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+class Registro:
+    """Métricas acumuladas pelo processo desde o início."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.em_andamento = 0
+        self.requisicoes: Dict[Tuple[str, str, int], int] = {}
+        self.latencias: Dict[Tuple[str, str], _Histograma] = {}
+        self.consultas: Dict[Tuple[str, str], _Histograma] = {}
+        self.fases: Dict[Tuple[str, str, str], float] = {}
+
+    def iniciar(self):
+        with self._lock:
+            self.em_andamento += 1
+
+    def finalizar(self, metodo: str, rota: str, status: int, duracao: float, medicao: Medicao):
+        chave = (metodo, rota)
+        with self._lock:
+            self.em_andamento -= 1
+            self.requisicoes[(metodo, rota, status)] = self.requisicoes.get((metodo, rota, status), 0) + 1
+            if chave not in self.latencias:
+                self.latencias[chave] = _Histograma(FAIXAS_LATENCIA)
+                self.consultas[chave] = _Histograma(FAIXAS_CONSULTAS)
+            self.latencias[chave].observar(duracao)
+            self.consultas[chave].observar(medicao.consultas)
+            for nome, segundos in medicao.fases.items():
+                self.fases[(metodo, rota, nome)] = self.fases.get((metodo, rota, nome), 0.0) + segundos
+
+    def _histogramas(self, linhas: List[str], nome: str, histogramas):
+        for (metodo, rota), hist in sorted(histogramas.items()):
+            acumulado = 0
+            for limite, contagem in zip(hist.faixas, hist.contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_rotulos(method=metodo, route=rota, le=f'{limite:g}')} {acumulado}")
+            acumulado += hist.contagens[-1]
+            linhas.append(f"{nome}_bucket{_rotulos(method=metodo, route=rota, le='+Inf')} {acumulado}")
+            linhas.append(f"{nome}_sum{_rotulos(method=metodo, route=rota)} {hist.soma:.6f}")
+            linhas.append(f"{nome}_count{_rotulos(method=metodo, route=rota)} {acumulado}")
+
+    def exportar(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            linhas = [
+                "# HELP http_requests_in_progress Requisições HTTP sendo atendidas.",
+                "# TYPE http_requests_in_progress gauge",
+                f"http_requests_in_progress {self.em_andamento}",
+                "# HELP http_requests_total Requisições HTTP atendidas.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (metodo, rota, status), total in sorted(self.requisicoes.items()):
+                linhas.append(f"http_requests_total{_rotulos(method=metodo, route=rota, status=status)} {total}")
+
+            linhas += [
+                "# HELP http_request_duration_seconds Latência das requisições HTTP.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            self._histogramas(linhas, "http_request_duration_seconds", self.latencias)
+
+            linhas += [
+                "# HELP http_request_db_queries Consultas ao banco por requisição.",
+                "# TYPE http_request_db_queries histogram",
+            ]
+            self._histogramas(linhas, "http_request_db_queries", self.consultas)
+
+            linhas += [
+                "# HELP http_request_phase_seconds_total Tempo gasto em cada fase das requisições.",
+                "# TYPE http_request_phase_seconds_total counter",
+            ]
+            for (metodo, rota, nome), segundos in sorted(self.fases.items()):
+                linhas.append(
+                    f"http_request_phase_seconds_total{_rotulos(method=metodo, route=rota, phase=nome)} {segundos:.6f}"
+                )
+        return "\n".join(linhas) + "\n"
+
+
+registro = Registro()
+
+
+# --- Middleware -------------------------------------------------------------
+
+def _molde_rota(scope) -> str:
+    """
+    Rota da requisição com os parâmetros no lugar dos valores
+    (``/items/{item_id}``), para não criar um rótulo por URL.
+    """
+    if "route" not in scope:
+        return ROTA_DESCONHECIDA
+    # O caminho completo é montado a partir da URL: a rota casada guarda
+    # só o trecho do roteador incluído, sem o prefixo
+    partes = scope["path"].split("/")
+    for nome, valor in scope.get("path_params", {}).items():
+        valor = str(valor)
+        for i in range(len(partes) - 1, -1, -1):
+            if partes[i] == valor:
+                partes[i] = "{" + nome + "}"
+                break
+    return "/".join(partes)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP e adiciona ``Server-Timing``."""
+
+    def __init__(self, app, registro: Registro = registro):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicao = Medicao()
+        token = _medicao.set(medicao)
+        inicio = time.perf_counter()
+        status = 500
+        self.registro.iniciar()
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                # Corpo em streaming: só entram as fases concluídas até aqui
+                MutableHeaders(scope=mensagem).append(
+                    "Server-Timing", medicao.server_timing(time.perf_counter() - inicio)
+                )
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicao.reset(token)
+            self.registro.finalizar(
+                scope["method"], _molde_rota(scope), status, time.perf_counter() - inicio, medicao
+            )
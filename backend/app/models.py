@@ -40,3 +40,10 @@ class IngredienteReceita(Base):
     item = relationship("Item")
 
 
+class GraphRevision(Base):
+    """Linha única com a revisão do grafo, incrementada a cada escrita confirmada."""
+
+    __tablename__ = "graph_revision"
+
+    id = Column(Integer, primary_key=True)
+    revisao = Column(Integer, default=0, nullable=False)
@@ -1,115 +1,277 @@
-from collections import defaultdict, deque
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from ..database import get_db
-from .. import crud, schemas
+from ..executor import em_processo
+from ..snapshot import GraphSnapshot, get_snapshot
+from ..trackers import Sessao, rastreadores
+from .. import schemas
 
 
 router = APIRouter()
 
 
-def build_graph(db: Session):
-    nodes, edges = crud.graph_data(db)
-    g_direct = defaultdict(list)
-    g_inverse = defaultdict(list)
-    for u, v in edges:
-        g_direct[u].append(v)
-        g_inverse[v].append(u)
-    return nodes, g_direct, g_inverse
+def _custo_json(custo):
+    # JSON não representa infinito: item inalcançável vira null
+    return None if custo == float('inf') else custo
 
 
 @router.post("/bfs")
-def bfs(req: schemas.BFSRequest, db: Session = Depends(get_db)):
+@em_processo
+def bfs(req: schemas.BFSRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
     recursos = req.recursos_iniciais or {}
-    nodes, g_direct, _ = build_graph(db)
-    fila = deque()
-    possiveis = set(recursos.keys())
-    recursos_disponiveis = recursos.copy()
-
-    for r in recursos.keys():
-        fila.append(r)
-
-    # Para verificar craft, precisamos das receitas completas
-    receitas = crud.list_recipes(db)
-
-    def pode_craftar(item):
-        for r in receitas:
-            if r.resultado_item.nome != item:
-                continue
-            ok = True
-            for ing in r.ingredientes:
-                if ing.item.nome not in recursos_disponiveis or recursos_disponiveis[ing.item.nome] < ing.quantidade:
-                    ok = False
-                    break
-            if ok:
-                return True
-        return False
-
-    while fila:
-        atual = fila.popleft()
-        for prox in g_direct.get(atual, []):
-            if prox not in possiveis and pode_craftar(prox):
-                possiveis.add(prox)
-                fila.append(prox)
-                recursos_disponiveis[prox] = float('inf')
-
-    return sorted(list(possiveis))
+    possiveis = snapshot.sistema.bfs_itens_possiveis(recursos)
+    return sorted(possiveis)
+
+
+# Rastreadores: o mesmo resultado do /bfs, mantido por deltas de inventário.
+# Guardam estado no processo, por isso não passam pelo pool de workers.
+
+def _tracker_out(chave: str, sessao: Sessao):
+    rastreador = sessao.rastreador
+    return {
+        "id": chave,
+        "revisao": sessao.revisao,
+        "inventario": dict(rastreador.inventario),
+        "possiveis": sorted(rastreador.possiveis()),
+    }
+
+
+def _sessao(tracker_id: str) -> Sessao:
+    sessao = rastreadores.obter(tracker_id)
+    if sessao is None:
+        raise HTTPException(status_code=404, detail="Rastreador não encontrado")
+    return sessao
+
+
+@router.post("/trackers", response_model=schemas.TrackerOut, status_code=201)
+def create_tracker(req: schemas.TrackerCreate, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    chave, sessao = rastreadores.criar(snapshot, req.inventario)
+    return _tracker_out(chave, sessao)
+
+
+@router.get("/trackers/{tracker_id}", response_model=schemas.TrackerOut)
+def get_tracker(tracker_id: str, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    sessao = _sessao(tracker_id)
+    with sessao.lock:
+        sessao.sincronizar(snapshot)
+        sessao.rastreador.aplicar({})
+        return _tracker_out(tracker_id, sessao)
+
+
+@router.post("/trackers/{tracker_id}/deltas", response_model=schemas.TrackerChanges)
+def apply_tracker_deltas(
+    tracker_id: str,
+    req: schemas.TrackerDeltas,
+    snapshot: GraphSnapshot = Depends(get_snapshot),
+):
+    sessao = _sessao(tracker_id)
+    with sessao.lock:
+        sessao.sincronizar(snapshot)
+        try:
+            ganhos, perdidos = sessao.rastreador.aplicar(req.deltas)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return {"revisao": sessao.revisao, "ganhos": sorted(ganhos), "perdidos": sorted(perdidos)}
+
+
+@router.delete("/trackers/{tracker_id}", status_code=204)
+def delete_tracker(tracker_id: str):
+    if not rastreadores.remover(tracker_id):
+        raise HTTPException(status_code=404, detail="Rastreador não encontrado")
+
+
+def _alvos_custo(req: schemas.CostRequest):
+    alvos = list(req.itens_alvo or [])
+    if req.item_alvo is not None and req.item_alvo not in alvos:
+        alvos.append(req.item_alvo)
+    return alvos
+
+
+def _resposta_custo(req: schemas.CostRequest, custos):
+    saida = {"custo": _custo_json(custos[req.item_alvo]) if req.item_alvo is not None else None}
+    if req.itens_alvo is not None:
+        saida["custos"] = {alvo: _custo_json(custos[alvo]) for alvo in req.itens_alvo}
+    return saida
 
 
 @router.post("/cost")
-def cost(req: schemas.CostRequest, db: Session = Depends(get_db)):
-    alvo = req.item_alvo
-    basicos = set(req.recursos_basicos or [])
-    nodes, g_direct, _ = build_graph(db)
-    dist = {n: float('inf') for n in nodes}
-    for b in basicos:
-        dist[b] = 0
-    visit = set()
-    while len(visit) < len(nodes):
-        u = None
-        best = float('inf')
-        for n in nodes:
-            if n not in visit and dist[n] < best:
-                best = dist[n]
-                u = n
-        if u is None:
-            break
-        visit.add(u)
-        for v in g_direct.get(u, []):
-            nd = dist[u] + 1
-            if nd < dist[v]:
-                dist[v] = nd
-    return {"custo": dist.get(alvo, float('inf'))}
+@em_processo
+def cost(req: schemas.CostRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    # Uma única execução do Dijkstra atende todos os alvos
+    custos = snapshot.sistema.custos_minimos(
+        req.recursos_basicos or [],
+        _alvos_custo(req),
+        ponderado=req.ponderado,
+        custo_base=req.custo_base,
+    )
+    return _resposta_custo(req, custos)
 
 
 @router.post("/path")
-def path(req: schemas.PathRequest, db: Session = Depends(get_db)):
-    alvo = req.item_alvo
-    basicos = set(req.recursos_basicos or [])
-    _, _, g_inverse = build_graph(db)
-    from collections import deque as dq
-    fila = dq([(alvo, [alvo])])
-    vis = {alvo}
-
-    receitas = crud.list_recipes(db)
-    mapa_receitas = defaultdict(list)
-    for r in receitas:
-        mapa_receitas[r.resultado_item.nome].append(r)
-
-    while fila:
-        atual, caminho = fila.popleft()
-        for r in mapa_receitas.get(atual, []):
-            todos_basicos = True
-            for ing in r.ingredientes:
-                if ing.item.nome not in basicos:
-                    todos_basicos = False
-                    if ing.item.nome not in vis:
-                        vis.add(ing.item.nome)
-                        fila.append((ing.item.nome, [ing.item.nome] + caminho))
-            if todos_basicos:
-                return {"caminho": caminho}
-
-    return {"caminho": None}
+@em_processo
+def path(req: schemas.PathRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    caminho = snapshot.sistema.caminho_crafting(
+        req.item_alvo, req.recursos_basicos or [], bidirecional=req.bidirecional
+    )
+    return {"caminho": caminho}
+
+
+@router.post("/paths")
+@em_processo
+def paths(
+    req: schemas.RoutesRequest,
+    k: int = Query(3, ge=1, le=50),
+    snapshot: GraphSnapshot = Depends(get_snapshot),
+):
+    rotas = snapshot.sistema.caminhos_alternativos(
+        req.item_alvo, req.recursos_basicos or [], k=k, ponderado=req.ponderado
+    )
+    return {"caminhos": [{"custo": custo, "caminho": caminho} for custo, caminho in rotas]}
+
+
+@router.post("/plan")
+@em_processo
+def plan(req: schemas.PlanRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    custo, plano = snapshot.sistema.plano_custo_minimo(
+        req.item_alvo,
+        req.recursos_basicos or [],
+        ponderado=req.ponderado,
+        custo_base=req.custo_base,
+    )
+    return {
+        "custo": _custo_json(custo),
+        "plano": None if plano is None else [
+            {
+                "resultado": item,
+                "quantidade_resultado": receita.quantidade_resultado,
+                "ingredientes": [[nome, qtd] for nome, qtd in receita.ingredientes],
+            }
+            for item, receita in plano.items()
+        ],
+    }
+
+
+@router.post("/bom")
+@em_processo
+def bom(req: schemas.BOMRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    if req.item_alvo not in snapshot.sistema.itens:
+        raise HTTPException(status_code=404, detail=f"Item '{req.item_alvo}' não encontrado")
+    try:
+        materiais = snapshot.sistema.lista_materiais(req.item_alvo, req.quantidade)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"item_alvo": req.item_alvo, "quantidade": req.quantidade, "materiais": materiais}
+
+
+@router.post("/max-craftable")
+@em_processo
+def max_craftable(req: schemas.MaxCraftableRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    if req.item_alvo not in snapshot.sistema.itens:
+        raise HTTPException(status_code=404, detail=f"Item '{req.item_alvo}' não encontrado")
+    try:
+        quantidade = snapshot.sistema.quantidade_maxima(req.item_alvo, req.inventario)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"item_alvo": req.item_alvo, "quantidade": _custo_json(quantidade)}
+
+
+@router.get("/cycles")
+def cycles(snapshot: GraphSnapshot = Depends(get_snapshot)):
+    sistema = snapshot.sistema
+    return {
+        "tem_ciclo": sistema.detectar_ciclos(),
+        "componentes": sistema.componentes_ciclicas() if sistema.detectar_ciclos() else [],
+    }
+
+
+def _indice(snapshot: GraphSnapshot, item: str):
+    indice = snapshot.sistema.indice_alcancabilidade()
+    if not indice.contem(item):
+        raise HTTPException(status_code=404, detail=f"Item '{item}' não encontrado")
+    return indice
+
+
+@router.get("/reachable")
+def reachable(item: str, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    indice = _indice(snapshot, item)
+    return {"item": item, "alcancaveis": indice.descendentes(item)}
+
+
+@router.get("/dependencies")
+def dependencies(
+    item: str,
+    apenas_basicos: bool = True,
+    snapshot: GraphSnapshot = Depends(get_snapshot),
+):
+    indice = _indice(snapshot, item)
+    return {"item": item, "dependencias": indice.ancestrais(item, apenas_basicos=apenas_basicos)}
+
+
+@router.post("/dominators")
+@em_processo
+def dominators(req: schemas.DominatorRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    return {"dominador_imediato": snapshot.sistema.dominadores(req.recursos_basicos)}
+
+
+@router.post("/bottlenecks")
+@em_processo
+def bottlenecks(req: schemas.BottleneckRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    if req.item_alvo not in snapshot.sistema.itens:
+        raise HTTPException(status_code=404, detail=f"Item '{req.item_alvo}' não encontrado")
+    gargalos = snapshot.sistema.gargalos(req.item_alvo, req.recursos_basicos)
+    return {"item_alvo": req.item_alvo, "alcancavel": gargalos is not None, "gargalos": gargalos or []}
+
+
+def _chave_dijkstra(req: schemas.CostRequest):
+    # Consultas com as mesmas fontes e pesos compartilham o mesmo Dijkstra
+    custo_base = tuple(sorted(req.custo_base.items())) if req.custo_base else ()
+    return frozenset(req.recursos_basicos or []), req.ponderado, custo_base
+
+
+_CONSULTAS = {
+    "bfs": bfs,
+    "path": path,
+    "plan": plan,
+    "bom": bom,
+    "max-craftable": max_craftable,
+    "bottlenecks": bottlenecks,
+}
+
+
+@router.post("/batch")
+@em_processo
+def batch(req: schemas.BatchRequest, snapshot: GraphSnapshot = Depends(get_snapshot)):
+    """
+    Avalia várias consultas contra o mesmo snapshot do grafo e devolve os
+    resultados na ordem recebida. Consultas de custo com os mesmos recursos
+    de base são atendidas por um único Dijkstra multi-alvo, e consultas
+    idênticas são calculadas uma vez. Um erro em uma consulta não derruba
+    as demais: ela recebe ``{"erro": {"status", "detail"}}``.
+    """
+    sistema = snapshot.sistema
 
+    alvos_por_fonte = {}
+    for consulta in req.consultas:
+        if consulta.tipo == "cost":
+            alvos_por_fonte.setdefault(_chave_dijkstra(consulta), set()).update(_alvos_custo(consulta))
+    custos = {
+        chave: sistema.custos_minimos(
+            list(chave[0]), sorted(alvos), ponderado=chave[1], custo_base=dict(chave[2])
+        )
+        for chave, alvos in alvos_por_fonte.items()
+    }
 
+    calculados = {}
+    resultados = []
+    for consulta in req.consultas:
+        chave = consulta.model_dump_json()
+        if chave not in calculados:
+            try:
+                if consulta.tipo == "cost":
+                    resultado = _resposta_custo(consulta, custos[_chave_dijkstra(consulta)])
+                else:
+                    resultado = _CONSULTAS[consulta.tipo](consulta, snapshot=snapshot)
+            except HTTPException as e:
+                resultado = {"erro": {"status": e.status_code, "detail": e.detail}}
+            calculados[chave] = resultado
+        resultados.append(calculados[chave])
+    return {"revisao": snapshot.revisao, "resultados": resultados}
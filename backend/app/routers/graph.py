@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
+from ..http_cache import cached_json_response, not_modified, revision_headers
+from ..snapshot import GraphSnapshot, get_snapshot
+from ..streaming import ndjson_response
 from .. import crud, schemas
 
 
@@ -9,57 +12,97 @@ router = APIRouter()
 
 
 @router.get("/", response_model=schemas.GraphOut)
-def get_graph(db: Session = Depends(get_db)):
-    nodes, edges = crud.graph_data(db)
-    # Convert nodes to GraphNode objects
-    graph_nodes = [schemas.GraphNode(id=node["id"], label=node["label"], eh_basico=node["eh_basico"]) for node in nodes]
-    return schemas.GraphOut(nodes=graph_nodes, edges=edges)
+async def get_graph(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def construir():
+        nodes, edges = await crud.graph_data(db)
+        # Convert nodes to GraphNode objects
+        graph_nodes = [schemas.GraphNode(id=node["id"], label=node["label"], eh_basico=node["eh_basico"]) for node in nodes]
+        return schemas.GraphOut(nodes=graph_nodes, edges=edges)
+
+    return await cached_json_response(request, await crud.get_revision(db), "graph", construir)
+
+
+@router.get("/nodes", response_model=schemas.GraphNodePage)
+async def get_nodes_page(
+    after_id: int = 0,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Nós do grafo paginados por cursor (keyset sobre o id do item)."""
+    rows = await crud.item_rows_page(db, after_id, limit)
+    return schemas.GraphNodePage(
+        nodes=[schemas.GraphNode(id=nome, label=nome, eh_basico=eh_basico) for _, nome, eh_basico in rows],
+        next_after_id=rows[-1][0] if len(rows) == limit else None,
+    )
+
+
+@router.get("/edges", response_model=schemas.GraphEdgePage)
+async def get_edges_page(
+    after_id: int = 0,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Arestas do grafo paginadas por cursor (keyset sobre o id do ingrediente)."""
+    rows = await crud.edge_rows_page(db, after_id, limit)
+    return schemas.GraphEdgePage(
+        edges=[(origem, destino) for _, origem, destino in rows],
+        next_after_id=rows[-1][0] if len(rows) == limit else None,
+    )
+
+
+@router.get("/stream")
+async def stream_graph(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Grafo em NDJSON: primeiro todos os nós, depois as arestas, lidos do
+    cursor do banco. Permite ao frontend desenhar o grafo progressivamente.
+    Leva o ETag da revisão, como ``GET /graph/``: com ``If-None-Match``
+    igual à revisão atual a resposta é um 304, sem reler o catálogo.
+    """
+    # A revisão é lida antes dos dados: uma escrita durante o envio deixa
+    # o ETag para trás, e a próxima requisição baixa o grafo de novo
+    revisao = await crud.get_revision(db)
+    resposta = not_modified(request, revisao)
+    if resposta is not None:
+        return resposta
+
+    async def linhas(db):
+        async for _, nome, eh_basico in crud.iter_item_rows(db):
+            yield {"type": "node", "id": nome, "label": nome, "eh_basico": eh_basico}
+        async for _, origem, destino in crud.iter_edge_rows(db):
+            yield {"type": "edge", "from": origem, "to": destino}
+
+    return ndjson_response(linhas, headers=revision_headers(revisao))
 
 
 @router.get("/adjacency", response_model=dict)
-def get_adjacency_list(db: Session = Depends(get_db)):
+async def get_adjacency_list(request: Request, snapshot: GraphSnapshot = Depends(get_snapshot)):
     """
     Retorna a estrutura da Lista de Adjacência para visualização no frontend.
     
     ESTRUTURA DE DADOS: Lista de Adjacência
     Uma das quatro estruturas para grafos estudadas em aula.
+    Os graus vêm dos contadores mantidos pela própria ListaAdjacencia.
     """
-    nodes, edges = crud.graph_data(db)
-    
-    # Constrói a Lista de Adjacência
-    adjacency_list = {}
-    
-    # Inicializa todos os nós com listas vazias
-    for node in nodes:
-        adjacency_list[node["id"]] = []
-    
-    # Adiciona as arestas (dependências de crafting)
-    for from_node, to_node in edges:
-        if to_node not in adjacency_list[from_node]:
-            adjacency_list[from_node].append(to_node)
-    
-    # Calcula estatísticas
-    total_vertices = len(nodes)
-    total_edges = len(edges)
-    
-    # Calcula graus
-    graus_entrada = {node["id"]: 0 for node in nodes}
-    graus_saida = {node["id"]: len(adjacency_list[node["id"]]) for node in nodes}
-    
-    for from_node, to_node in edges:
-        graus_entrada[to_node] += 1
+    async def construir():
+        return _adjacency_body(snapshot)
+
+    return await cached_json_response(request, snapshot.revisao, "adjacency", construir)
+
+
+def _adjacency_body(snapshot: GraphSnapshot) -> dict:
+    sistema = snapshot.sistema
+    grafo = sistema.grafo_direto
+    vertices = sorted(sistema.itens)
     
     return {
         "estrutura": "Lista de Adjacência",
         "descricao": "Cada item mantém uma lista de itens que podem ser craftados com ele",
-        "adjacency_list": adjacency_list,
+        "adjacency_list": {v: grafo.obter_adjacentes(v) for v in vertices},
         "estatisticas": {
-            "total_vertices": total_vertices,
-            "total_arestas": total_edges,
-            "graus_entrada": graus_entrada,
-            "graus_saida": graus_saida
+            "total_vertices": len(vertices),
+            "total_arestas": grafo.total_arestas(),
+            "graus_entrada": {v: grafo.grau_entrada(v) for v in vertices},
+            "graus_saida": {v: grafo.grau_saida(v) for v in vertices}
         },
-        "nodes_info": {node["id"]: {"eh_basico": node["eh_basico"], "label": node["label"]} for node in nodes}
+        "nodes_info": {v: {"eh_basico": sistema.itens[v].eh_basico, "label": v} for v in vertices}
     }
-
-
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
+from ..http_cache import cached_json_response
 from .. import crud, schemas
 
 
@@ -9,15 +10,19 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.ItemOut])
-def list_all(db: Session = Depends(get_db)):
-    return crud.list_items(db)
+async def list_all(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def construir():
+        return [schemas.ItemOut.model_validate(i) for i in await crud.list_items(db)]
+
+    return await cached_json_response(request, await crud.get_revision(db), "items", construir)
 
 
 @router.post("/", response_model=schemas.ItemOut)
-def create(item: schemas.ItemCreate, db: Session = Depends(get_db)):
-    obj = crud.get_or_create_item(db, item.nome, item.eh_basico)
-    db.commit()
-    db.refresh(obj)
+async def create(item: schemas.ItemCreate, db: AsyncSession = Depends(get_async_db)):
+    obj = await crud.get_or_create_item(db, item.nome, item.eh_basico)
+    await crud.bump_revision(db)
+    await db.commit()
+    await db.refresh(obj)
     return obj
 
 
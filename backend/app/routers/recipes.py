@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_async_db
+from ..http_cache import cached_json_response, not_modified, revision_headers
+from ..streaming import ndjson_response
 from .. import crud, schemas
 
 
@@ -9,34 +11,63 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.ReceitaOut])
-def list_all(db: Session = Depends(get_db)):
-    receitas = crud.list_recipes(db)
-    saida: list[schemas.ReceitaOut] = []
-    for r in receitas:
-        saida.append(
-            schemas.ReceitaOut(
-                id=r.id,
-                resultado_nome=r.resultado_item.nome,
-                quantidade_resultado=r.quantidade_resultado,
-                ingredientes=[
-                    schemas.IngredienteOut(item_nome=ing.item.nome, quantidade=ing.quantidade)
-                    for ing in r.ingredientes
-                ],
-            )
-        )
-    return saida
+async def list_all(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def construir():
+        return [_receita_dict(r) for r in await crud.list_recipe_tuples(db)]
+
+    return await cached_json_response(request, await crud.get_revision(db), "recipes", construir)
+
+
+@router.get("/page", response_model=schemas.ReceitaPage)
+async def list_page(
+    after_id: int = 0,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Paginação por cursor (keyset): passe ``next_after_id`` como ``after_id``."""
+    receitas = list(crud.group_recipe_rows(await crud.recipe_rows_page(db, after_id, limit)))
+    return schemas.ReceitaPage(
+        receitas=[_receita_dict(r) for r in receitas],
+        next_after_id=receitas[-1][0] if len(receitas) == limit else None,
+    )
+
+
+@router.get("/stream")
+async def stream(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Todas as receitas em NDJSON, uma por linha, lidas do cursor do banco."""
+    revisao = await crud.get_revision(db)
+    resposta = not_modified(request, revisao)
+    if resposta is not None:
+        return resposta
+
+    async def linhas(db):
+        async for receita in crud.agroup_recipe_rows(crud.iter_recipe_rows(db)):
+            yield _receita_dict(receita)
+
+    return ndjson_response(linhas, headers=revision_headers(revisao))
+
+
+def _receita_dict(receita: tuple) -> dict:
+    receita_id, resultado_nome, qtd_resultado, ingredientes = receita
+    return {
+        "id": receita_id,
+        "resultado_nome": resultado_nome,
+        "quantidade_resultado": qtd_resultado,
+        "ingredientes": [{"item_nome": nome, "quantidade": qtd} for nome, qtd in ingredientes],
+    }
 
 
 @router.post("/", response_model=schemas.ReceitaOut)
-def create(receita: schemas.ReceitaCreate, db: Session = Depends(get_db)):
-    obj = crud.create_recipe(
+async def create(receita: schemas.ReceitaCreate, db: AsyncSession = Depends(get_async_db)):
+    obj = await crud.create_recipe(
         db,
         resultado_nome=receita.resultado_nome,
         quantidade_resultado=receita.quantidade_resultado,
         ingredientes=[(i.item_nome, i.quantidade) for i in receita.ingredientes],
     )
-    db.commit()
-    db.refresh(obj)
+    await crud.bump_revision(db)
+    await db.commit()
+    obj = await crud.get_recipe(db, obj.id)
     return schemas.ReceitaOut(
         id=obj.id,
         resultado_nome=obj.resultado_item.nome,
@@ -48,3 +79,16 @@ def create(receita: schemas.ReceitaCreate, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def create_bulk(payload: schemas.ReceitaBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    resultado = await crud.create_recipes_bulk(
+        db,
+        itens=[(i.nome, i.eh_basico) for i in payload.itens],
+        receitas=[
+            (r.resultado_nome, r.quantidade_resultado, [(i.item_nome, i.quantidade) for i in r.ingredientes])
+            for r in payload.receitas
+        ],
+    )
+    await crud.bump_revision(db)
+    await db.commit()
+    return resultado
@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Annotated, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, Field, conint
 
 
 class ItemCreate(BaseModel):
@@ -18,15 +18,25 @@ class ItemOut(BaseModel):
 
 class IngredienteIn(BaseModel):
     item_nome: str
-    quantidade: int = 1
+    quantidade: int = Field(1, ge=1)
 
 
 class ReceitaCreate(BaseModel):
     resultado_nome: str
-    quantidade_resultado: int = 1
+    quantidade_resultado: int = Field(1, ge=1)
     ingredientes: List[IngredienteIn]
 
 
+class ReceitaBulkCreate(BaseModel):
+    itens: List[ItemCreate] = []
+    receitas: List[ReceitaCreate] = []
+
+
+class BulkResult(BaseModel):
+    itens_criados: int
+    receitas_criadas: int
+
+
 class IngredienteOut(BaseModel):
     item_nome: str
     quantidade: int
@@ -53,17 +63,130 @@ class GraphOut(BaseModel):
     edges: List[tuple]
 
 
+class ReceitaPage(BaseModel):
+    receitas: List[ReceitaOut]
+    next_after_id: Optional[int] = None
+
+
+class GraphNodePage(BaseModel):
+    nodes: List[GraphNode]
+    next_after_id: Optional[int] = None
+
+
+class GraphEdgePage(BaseModel):
+    edges: List[tuple]
+    next_after_id: Optional[int] = None
+
+
 class BFSRequest(BaseModel):
     recursos_iniciais: dict
 
 
+class TrackerCreate(BaseModel):
+    inventario: Dict[str, conint(ge=0)] = {}
+
+
+class TrackerDeltas(BaseModel):
+    deltas: Dict[str, int]
+
+
+class TrackerOut(BaseModel):
+    id: str
+    revisao: int
+    inventario: Dict[str, int]
+    possiveis: List[str]
+
+
+class TrackerChanges(BaseModel):
+    revisao: int
+    ganhos: List[str]
+    perdidos: List[str]
+
+
 class CostRequest(BaseModel):
-    item_alvo: str
+    item_alvo: Optional[str] = None
+    itens_alvo: Optional[List[str]] = None
     recursos_basicos: List[str]
+    ponderado: bool = False
+    custo_base: Optional[Dict[str, float]] = None
 
 
 class PathRequest(BaseModel):
     item_alvo: str
     recursos_basicos: List[str]
+    bidirecional: bool = False
+
+
+class BOMRequest(BaseModel):
+    item_alvo: str
+    quantidade: int = Field(1, ge=1)
+
+
+class MaxCraftableRequest(BaseModel):
+    item_alvo: str
+    inventario: Dict[str, conint(ge=0)]
+
+
+class PlanRequest(BaseModel):
+    item_alvo: str
+    recursos_basicos: List[str]
+    ponderado: bool = True
+    custo_base: Optional[Dict[str, float]] = None
+
+
+class RoutesRequest(BaseModel):
+    item_alvo: str
+    recursos_basicos: List[str]
+    ponderado: bool = False
+
+
+class DominatorRequest(BaseModel):
+    # Sem recursos informados, usa os itens marcados como básicos
+    recursos_basicos: Optional[List[str]] = None
+
+
+class BottleneckRequest(BaseModel):
+    item_alvo: str
+    recursos_basicos: Optional[List[str]] = None
+
+
+# --- Consultas em lote (/algorithms/batch) ---------------------------------
+# Cada consulta é o corpo do endpoint correspondente mais o campo ``tipo``.
+
+class BatchBFS(BFSRequest):
+    tipo: Literal["bfs"]
+
+
+class BatchCost(CostRequest):
+    tipo: Literal["cost"]
+
+
+class BatchPath(PathRequest):
+    tipo: Literal["path"]
+
+
+class BatchPlan(PlanRequest):
+    tipo: Literal["plan"]
+
+
+class BatchBOM(BOMRequest):
+    tipo: Literal["bom"]
+
+
+class BatchMaxCraftable(MaxCraftableRequest):
+    tipo: Literal["max-craftable"]
+
+
+class BatchBottleneck(BottleneckRequest):
+    tipo: Literal["bottlenecks"]
+
+
+BatchQuery = Annotated[
+    Union[BatchBFS, BatchCost, BatchPath, BatchPlan, BatchBOM, BatchMaxCraftable, BatchBottleneck],
+    Field(discriminator="tipo"),
+]
+
 
+class BatchRequest(BaseModel):
+    consultas: List[BatchQuery] = Field(..., max_length=1000)
 
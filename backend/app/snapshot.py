@@ -0,0 +1,80 @@
+"""
+Snapshot em memória do grafo de receitas, compartilhado pelo processo.
+
+O grafo é carregado do banco uma única vez por revisão (ver
+crud.get_revision) e reaproveitado por todos os endpoints de algoritmos.
+Qualquer escrita confirmada incrementa a revisão, e o snapshot é
+reconstruído na próxima leitura, inclusive em outros workers.
+"""
+
+import asyncio
+from typing import List, Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from crafting.system import SistemaCrafting
+
+from .database import get_async_db
+from .metrics import fase
+from . import crud
+
+
+class GraphSnapshot:
+    """
+    Grafo de receitas compilado a partir do banco, em uma revisão.
+
+    Índices disponíveis em ``sistema``:
+    - ``grafo_direto``: item -> itens que podem ser craftados com ele
+    - ``grafo_inverso``: resultado -> receitas que o produzem
+    """
+
+    def __init__(self, sistema: SistemaCrafting, revisao: int):
+        self.sistema = sistema
+        self.revisao = revisao
+
+
+_snapshot: Optional[GraphSnapshot] = None
+_lock = asyncio.Lock()
+
+
+def _compilar(itens: List[tuple], receitas: List[tuple]) -> SistemaCrafting:
+    sistema = SistemaCrafting()
+    for nome, eh_basico in itens:
+        sistema.adicionar_item(nome, eh_basico=eh_basico)
+    for _, resultado_nome, qtd_resultado, ingredientes in receitas:
+        sistema.adicionar_receita(ingredientes, resultado_nome, qtd_resultado)
+    # O snapshot é somente leitura: as travessias rodam sobre o CSR
+    sistema.congelar()
+    # Montado junto com o snapshot (sob o mesmo lock), e não na primeira
+    # consulta de /algorithms/reachable ou /dependencies
+    sistema.indice_alcancabilidade()
+    return sistema
+
+
+async def build_snapshot(db: AsyncSession, revisao: int) -> GraphSnapshot:
+    itens = await crud.item_rows(db)
+    receitas = await crud.list_recipe_tuples(db)
+    # Montar o grafo é trabalho de CPU: fora do event loop
+    sistema = await run_in_threadpool(_compilar, itens, receitas)
+    return GraphSnapshot(sistema, revisao)
+
+
+async def get_snapshot(db: AsyncSession = Depends(get_async_db)) -> GraphSnapshot:
+    global _snapshot
+    # A revisão é lida antes dos dados: se uma escrita acontecer durante a
+    # carga, o snapshot fica marcado com a revisão antiga e é refeito depois.
+    revisao = await crud.get_revision(db)
+    atual = _snapshot
+    if atual is not None and atual.revisao == revisao:
+        return atual
+
+    async with _lock:
+        if _snapshot is not None and _snapshot.revisao == revisao:
+            return _snapshot
+        with fase("snapshot"):
+            novo = await build_snapshot(db, revisao)
+        if _snapshot is None or _snapshot.revisao < revisao:
+            _snapshot = novo
+        return novo
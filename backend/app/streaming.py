@@ -0,0 +1,39 @@
+"""
+Respostas NDJSON (um objeto JSON por linha) lidas direto do cursor do banco.
+
+O cliente recebe as linhas à medida que o banco as devolve, e o servidor
+nunca monta o catálogo inteiro em memória.
+"""
+
+import json
+from typing import Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+from .database import AsyncSessionLocal
+
+
+# Linhas agrupadas em cada bloco enviado ao cliente
+LINES_PER_CHUNK = 500
+
+
+def ndjson_response(produzir, headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    ``produzir(db)`` é um gerador assíncrono de dicionários; cada um vira
+    uma linha.
+
+    A sessão é aberta pelo próprio gerador: o corpo continua sendo enviado
+    depois que as dependências do endpoint (como get_async_db) já terminaram.
+    """
+    async def corpo():
+        async with AsyncSessionLocal() as db:
+            bloco = []
+            async for obj in produzir(db):
+                bloco.append(json.dumps(obj, ensure_ascii=False))
+                if len(bloco) >= LINES_PER_CHUNK:
+                    yield "\n".join(bloco) + "\n"
+                    bloco = []
+            if bloco:
+                yield "\n".join(bloco) + "\n"
+
+    return StreamingResponse(corpo(), media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,69 @@
+"""
+Rastreadores de itens possíveis mantidos entre requisições.
+
+Cada rastreador guarda um inventário e o resultado de
+``bfs_itens_possiveis`` para ele, atualizado por deltas
+(``POST /algorithms/trackers/{id}/deltas``) sem refazer a busca inteira.
+Ficam na memória do processo, limitados aos ``MAX_TRACKERS`` usados mais
+recentemente; com vários workers do uvicorn, cada um tem os seus. Quando o
+snapshot do grafo muda de revisão, o rastreador passa a acompanhar o novo
+sistema na próxima requisição.
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from crafting.rastreador import RastreadorCraftaveis
+
+from .snapshot import GraphSnapshot
+
+
+MAX_TRACKERS = int(os.getenv("MAX_TRACKERS", "1000") or 1000)
+
+
+class Sessao:
+    """Um rastreador e a revisão do snapshot que ele acompanha."""
+
+    def __init__(self, rastreador: RastreadorCraftaveis, revisao: int):
+        self.rastreador = rastreador
+        self.revisao = revisao
+        self.lock = threading.Lock()
+
+    def sincronizar(self, snapshot: GraphSnapshot):
+        """Troca para o snapshot, se for mais novo; os contadores são refeitos no próximo ``aplicar``."""
+        if snapshot.revisao > self.revisao:
+            self.rastreador.trocar_sistema(snapshot.sistema)
+            self.revisao = snapshot.revisao
+
+
+class Rastreadores:
+    def __init__(self, limite: int = MAX_TRACKERS):
+        self.limite = limite
+        self._sessoes: "OrderedDict[str, Sessao]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def criar(self, snapshot: GraphSnapshot, inventario: Dict[str, int]) -> Tuple[str, Sessao]:
+        sessao = Sessao(snapshot.sistema.rastreador_craftaveis(inventario), snapshot.revisao)
+        chave = uuid.uuid4().hex
+        with self._lock:
+            self._sessoes[chave] = sessao
+            while len(self._sessoes) > self.limite:
+                self._sessoes.popitem(last=False)
+        return chave, sessao
+
+    def obter(self, chave: str) -> Optional[Sessao]:
+        with self._lock:
+            sessao = self._sessoes.get(chave)
+            if sessao is not None:
+                self._sessoes.move_to_end(chave)
+            return sessao
+
+    def remover(self, chave: str) -> bool:
+        with self._lock:
+            return self._sessoes.pop(chave, None) is not None
+
+
+rastreadores = Rastreadores()
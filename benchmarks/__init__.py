@@ -0,0 +1 @@
+"""Benchmarks do sistema de crafting e da API sobre catálogos sintéticos."""
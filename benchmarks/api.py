@@ -0,0 +1,175 @@
+"""
+Benchmarks dos principais endpoints da API sobre um banco SQLite local.
+
+Uso (na raiz do projeto):
+
+    python -m benchmarks.api --itens 1000 10000
+
+Para cada tamanho, um banco SQLite novo é criado em uma pasta temporária,
+o catálogo sintético é importado por ``POST /recipes/bulk`` e os endpoints
+são chamados por um cliente ASGI em processo (sem rede). Leituras com
+cache por revisão são medidas a frio (logo após uma escrita), com o corpo
+em cache e com ``If-None-Match`` (304).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from .comum import Resultados, argumentos_comuns, gerar
+
+
+# Receitas por requisição ao importar o catálogo
+RECEITAS_POR_CARGA = 20000
+
+
+def criar_app_sqlite(caminho_banco):
+    """
+    ``create_app`` apontando para um arquivo SQLite. Precisa ser chamada
+    antes de qualquer import de ``backend.app``: a URL do banco é lida na
+    importação de ``backend.app.database``.
+    """
+    url = f"sqlite:///{caminho_banco}"
+    carregado = sys.modules.get("backend.app.database")
+    if carregado is not None and carregado.DATABASE_URL != url:
+        raise RuntimeError("backend.app já foi importado com outro DATABASE_URL")
+    os.environ["DATABASE_URL"] = url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+
+    from backend.app.main import create_app
+
+    return create_app()
+
+
+def verificar(resposta, *esperados):
+    if resposta.status_code not in (esperados or (200,)):
+        raise RuntimeError(f"{resposta.request.method} {resposta.request.url}: "
+                           f"{resposta.status_code} {resposta.text[:200]}")
+    return resposta
+
+
+def cargas_catalogo(catalogo, receitas_por_carga=RECEITAS_POR_CARGA):
+    """Corpos de ``POST /recipes/bulk`` que importam o catálogo, em blocos."""
+    corpo = catalogo.para_json()
+    receitas = corpo["receitas"]
+    yield {"itens": corpo["itens"], "receitas": receitas[:receitas_por_carga]}
+    for inicio in range(receitas_por_carga, len(receitas), receitas_por_carga):
+        yield {"itens": [], "receitas": receitas[inicio:inicio + receitas_por_carga]}
+
+
+def importar_catalogo(cliente, catalogo, receitas_por_carga=RECEITAS_POR_CARGA):
+    """Importa itens e receitas por ``POST /recipes/bulk``."""
+    for carga in cargas_catalogo(catalogo, receitas_por_carga):
+        verificar(cliente.post("/recipes/bulk", json=carga))
+
+
+def medir_api(resultados, args, total_itens, pasta):
+    from fastapi.testclient import TestClient
+
+    r = args.repeticoes
+    catalogo = gerar(args, total_itens)
+    app = criar_app_sqlite(os.path.join(pasta, "bench.db"))
+
+    with TestClient(app) as cliente:
+        resultados.medir("POST /recipes/bulk (catálogo inteiro)",
+                         lambda: importar_catalogo(cliente, catalogo), total_itens, 1)
+
+        contador = itertools.count()
+
+        def escrever():
+            verificar(cliente.post("/items/", json={"nome": f"bench {next(contador)}"}))
+
+        def medir_get(rota, nome=None):
+            nome = nome or f"GET {rota}"
+            resultados.medir(f"{nome} (após escrita)", lambda: verificar(cliente.get(rota)), total_itens, r, escrever)
+            resposta = resultados.medir(f"{nome} (em cache)", lambda: verificar(cliente.get(rota)), total_itens, r)
+            etag = resposta.headers.get("etag")
+            if etag:
+                resultados.medir(f"{nome} (304)",
+                                 lambda: verificar(cliente.get(rota, headers={"If-None-Match": etag}), 304),
+                                 total_itens, r)
+
+        medir_get("/items/")
+        medir_get("/recipes/")
+        medir_get("/graph/")
+        medir_get("/graph/adjacency")
+
+        m = lambda nome, funcao, preparar=None: resultados.medir(nome, funcao, total_itens, r, preparar)
+        m("GET /graph/nodes (1000)", lambda: verificar(cliente.get("/graph/nodes?limit=1000")))
+        m("GET /graph/edges (1000)", lambda: verificar(cliente.get("/graph/edges?limit=1000")))
+        m("GET /recipes/page (500)", lambda: verificar(cliente.get("/recipes/page?limit=500")))
+        m("GET /graph/stream", lambda: verificar(cliente.get("/graph/stream")))
+        m("GET /recipes/stream", lambda: verificar(cliente.get("/recipes/stream")))
+
+        rng = random.Random(args.semente)
+        basicos = catalogo.camadas[0]
+        alvo = rng.choice(catalogo.camadas[-1])
+        consulta = {"item_alvo": alvo, "recursos_basicos": basicos}
+        inventario = {nome: 1000 for nome in basicos}
+
+        post = lambda rota, corpo: lambda: verificar(cliente.post(rota, json=corpo))
+        m("POST /algorithms/path (1ª após escrita: snapshot)", post("/algorithms/path", consulta), escrever)
+        m("POST /algorithms/bfs", post("/algorithms/bfs", {"recursos_iniciais": inventario}))
+        m("POST /algorithms/cost", post("/algorithms/cost", consulta))
+        m("POST /algorithms/path", post("/algorithms/path", consulta))
+        m("POST /algorithms/paths?k=3", post("/algorithms/paths?k=3", consulta))
+        m("POST /algorithms/plan", post("/algorithms/plan", consulta))
+        if not args.ciclos:  # a lista de materiais exige receitas sem ciclo
+            m("POST /algorithms/bom", post("/algorithms/bom", {"item_alvo": alvo, "quantidade": 10}))
+            m("POST /algorithms/max-craftable",
+              post("/algorithms/max-craftable", {"item_alvo": alvo, "inventario": inventario}))
+        alvos = rng.sample(catalogo.camadas[-1], min(20, len(catalogo.camadas[-1])))
+        m("POST /algorithms/batch (20 custos + 20 caminhos)", post("/algorithms/batch", {"consultas": [
+            {"tipo": tipo, "item_alvo": a, "recursos_basicos": basicos} for a in alvos for tipo in ("cost", "path")
+        ]}))
+        m("GET /algorithms/reachable", lambda: verificar(cliente.get("/algorithms/reachable", params={"item": basicos[0]})))
+        m("GET /algorithms/dependencies", lambda: verificar(cliente.get("/algorithms/dependencies", params={"item": alvo})))
+
+
+def _por_subprocesso(args):
+    """Roda cada tamanho em um processo próprio (o DATABASE_URL é fixo por processo)."""
+    medicoes = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for total_itens in args.itens:
+            parcial = os.path.join(pasta, f"{total_itens}.json")
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.api",
+                    "--itens", str(total_itens),
+                    "--profundidade", str(args.profundidade),
+                    "--fan-in", *map(str, args.fan_in),
+                    "--concentracao", str(args.concentracao),
+                    "--receitas-alternativas", str(args.receitas_alternativas),
+                    "--ciclos", str(args.ciclos),
+                    "--semente", str(args.semente),
+                    "--repeticoes", str(args.repeticoes),
+                    "--saida", parcial,
+                ],
+                check=True,
+            )
+            with open(parcial, encoding="utf-8") as f:
+                medicoes.extend(json.load(f)["medicoes"])
+    return medicoes
+
+
+def main(argv=None):
+    parser = argumentos_comuns(argparse.ArgumentParser(description=__doc__.splitlines()[1]))
+    parser.set_defaults(itens=[1000, 10000])
+    args = parser.parse_args(argv)
+
+    resultados = Resultados("api", vars(args))
+    if len(args.itens) > 1:
+        resultados.medicoes = _por_subprocesso(args)
+    else:
+        with tempfile.TemporaryDirectory() as pasta:
+            medir_api(resultados, args, args.itens[0], pasta)
+    resultados.salvar(args.saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Teste de carga HTTP: tráfego concorrente misto de leituras e escritas.
+
+Uso (na raiz do projeto):
+
+    python -m benchmarks.carga --itens 10000 --concorrencia 32 --duracao 30
+
+O app de ``backend.app.main:create_app`` é criado sobre um SQLite
+temporário e populado com um catálogo sintético. Por padrão as
+requisições passam por um cliente ASGI em processo (``httpx`` com
+``ASGITransport``): cliente e servidor dividem o mesmo event loop, então
+os números servem para comparar commits, não como capacidade absoluta.
+Com ``--uvicorn`` o app sobe em um processo uvicorn local e o tráfego
+passa por HTTP de verdade.
+
+Para cada rota são reportados as latências (p50/p90/p99/máx), um
+histograma, a vazão e a taxa de erros. O JSON gerado pode ser comparado
+com ``python -m benchmarks.comparar`` (a mediana é o p50).
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+from .api import cargas_catalogo, criar_app_sqlite, verificar
+from .comum import Resultados, argumentos_catalogo, gerar
+
+
+# Limites superiores (em segundos) das faixas do histograma de latência
+FAIXAS_HISTOGRAMA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Status considerados sucesso (304: resposta condicional com ETag)
+STATUS_OK = (200, 304)
+
+
+def operacoes(catalogo, fracao_escrita, ciclico=False):
+    """
+    Mistura de requisições: lista de (rota, peso, montar), onde
+    ``montar(rng)`` devolve (método, url, corpo JSON).
+
+    Os pesos das leituras são relativos entre si; as escritas somam
+    ``fracao_escrita`` do total. Em catálogos ``ciclico`` as rotas de
+    lista de materiais ficam de fora (responderiam 422).
+    """
+    basicos = catalogo.camadas[0]
+    topo = catalogo.camadas[-1]
+    intermediarios = [nome for camada in catalogo.camadas[1:-1] for nome in camada] or topo
+    inventario = {nome: 1000 for nome in basicos}
+    novos = itertools.count()
+
+    def consulta(rng):
+        return {"item_alvo": rng.choice(topo), "recursos_basicos": basicos}
+
+    def lote(rng):
+        alvos = rng.sample(topo, min(5, len(topo)))
+        return {"consultas": [
+            {"tipo": tipo, "item_alvo": alvo, "recursos_basicos": basicos}
+            for alvo in alvos for tipo in ("cost", "path")
+        ]}
+
+    def receita(rng):
+        ingredientes = rng.sample(intermediarios, min(2, len(intermediarios)))
+        return {
+            "resultado_nome": f"Carga {next(novos)}",
+            "quantidade_resultado": 1,
+            "ingredientes": [{"item_nome": nome, "quantidade": rng.randint(1, 4)} for nome in ingredientes],
+        }
+
+    leituras = [
+        ("GET /graph/", 3, lambda rng: ("GET", "/graph/", None)),
+        ("GET /graph/adjacency", 3, lambda rng: ("GET", "/graph/adjacency", None)),
+        ("GET /items/", 2, lambda rng: ("GET", "/items/", None)),
+        ("GET /recipes/", 1, lambda rng: ("GET", "/recipes/", None)),
+        ("GET /graph/nodes", 1, lambda rng: ("GET", "/graph/nodes?limit=500", None)),
+        ("POST /algorithms/path", 3, lambda rng: ("POST", "/algorithms/path", consulta(rng))),
+        ("POST /algorithms/cost", 3, lambda rng: ("POST", "/algorithms/cost", consulta(rng))),
+        ("POST /algorithms/plan", 2, lambda rng: ("POST", "/algorithms/plan", consulta(rng))),
+        ("POST /algorithms/bom", 2, lambda rng: (
+            "POST", "/algorithms/bom", {"item_alvo": rng.choice(topo), "quantidade": rng.randint(1, 100)})),
+        ("POST /algorithms/max-craftable", 1, lambda rng: (
+            "POST", "/algorithms/max-craftable", {"item_alvo": rng.choice(topo), "inventario": inventario})),
+        ("POST /algorithms/bfs", 1, lambda rng: ("POST", "/algorithms/bfs", {"recursos_iniciais": inventario})),
+        ("POST /algorithms/bottlenecks", 1, lambda rng: ("POST", "/algorithms/bottlenecks", consulta(rng))),
+        ("POST /algorithms/batch", 1, lambda rng: ("POST", "/algorithms/batch", lote(rng))),
+    ]
+    if ciclico:
+        leituras = [op for op in leituras if op[0] not in ("POST /algorithms/bom", "POST /algorithms/max-craftable")]
+    escritas = [
+        ("POST /items/", 1, lambda rng: ("POST", "/items/", {"nome": f"Carga {next(novos)}"})),
+        ("POST /recipes/", 1, lambda rng: ("POST", "/recipes/", receita(rng))),
+    ]
+
+    total_leituras = sum(peso for _, peso, _ in leituras)
+    total_escritas = sum(peso for _, peso, _ in escritas)
+    mistura = [(rota, (1 - fracao_escrita) * peso / total_leituras, montar) for rota, peso, montar in leituras]
+    if fracao_escrita > 0:
+        mistura += [(rota, fracao_escrita * peso / total_escritas, montar) for rota, peso, montar in escritas]
+    return mistura
+
+
+async def _usuario(cliente, mistura, rng, inicio_medicao, fim, registros, usar_etag):
+    """Um cliente virtual: envia requisições em sequência até ``fim``."""
+    import httpx
+
+    rotas = [(rota, montar) for rota, _, montar in mistura]
+    acumulados = list(itertools.accumulate(peso for _, peso, _ in mistura))
+    etags = {}
+    while time.perf_counter() < fim:
+        rota, montar = rng.choices(rotas, cum_weights=acumulados)[0]
+        metodo, url, corpo = montar(rng)
+        headers = {"If-None-Match": etags[url]} if usar_etag and url in etags else None
+
+        inicio = time.perf_counter()
+        try:
+            resposta = await cliente.request(metodo, url, json=corpo, headers=headers)
+            status = resposta.status_code
+        except httpx.HTTPError as erro:
+            resposta = None
+            status = type(erro).__name__
+        duracao = time.perf_counter() - inicio
+
+        if usar_etag and resposta is not None and "etag" in resposta.headers:
+            etags[url] = resposta.headers["etag"]
+        # Requisições do aquecimento não entram nas estatísticas
+        if inicio >= inicio_medicao:
+            registros.setdefault(rota, []).append((duracao, status))
+
+
+def _percentil(ordenados, p):
+    # Nearest-rank: o menor valor com pelo menos p% das amostras até ele
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def resumo(rota, amostras, itens, duracao):
+    tempos = sorted(t for t, _ in amostras)
+    status = {}
+    for _, codigo in amostras:
+        status[str(codigo)] = status.get(str(codigo), 0) + 1
+    erros = sum(1 for _, codigo in amostras if codigo not in STATUS_OK)
+
+    histograma = [0] * (len(FAIXAS_HISTOGRAMA) + 1)
+    for t in tempos:
+        histograma[next((i for i, limite in enumerate(FAIXAS_HISTOGRAMA) if t <= limite), -1)] += 1
+
+    return {
+        "nome": rota,
+        "itens": itens,
+        "requisicoes": len(tempos),
+        "min_s": tempos[0],
+        "mediana_s": _percentil(tempos, 50),
+        "p90_s": _percentil(tempos, 90),
+        "p99_s": _percentil(tempos, 99),
+        "max_s": tempos[-1],
+        "media_s": sum(tempos) / len(tempos),
+        "vazao_rps": len(tempos) / duracao,
+        "erros": erros,
+        "taxa_erros": erros / len(tempos),
+        "status": status,
+        "histograma": [
+            {"ate_s": limite, "contagem": contagem}
+            for limite, contagem in zip(FAIXAS_HISTOGRAMA + (None,), histograma)
+        ],
+    }
+
+
+def imprimir(medicoes, mostrar_histogramas):
+    print(f"{'rota':<34} {'req':>7} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'máx ms':>9} {'erros':>7}")
+    for m in medicoes:
+        print(
+            f"{m['nome']:<34} {m['requisicoes']:>7} {m['vazao_rps']:>8.1f} "
+            f"{m['mediana_s'] * 1000:>9.2f} {m['p90_s'] * 1000:>9.2f} {m['p99_s'] * 1000:>9.2f} "
+            f"{m['max_s'] * 1000:>9.2f} {m['taxa_erros']:>7.1%}"
+        )
+        if mostrar_histogramas:
+            maior = max(faixa["contagem"] for faixa in m["histograma"])
+            for faixa in m["histograma"]:
+                if faixa["contagem"]:
+                    rotulo = f"<= {faixa['ate_s'] * 1000:g} ms" if faixa["ate_s"] is not None else "> 10000 ms"
+                    barra = "#" * max(1, round(40 * faixa["contagem"] / maior))
+                    print(f"    {rotulo:>12} {faixa['contagem']:>7} {barra}")
+
+
+@asynccontextmanager
+async def cliente_asgi(caminho_banco, timeout):
+    """Cliente ``httpx`` ligado ao app em processo, com o lifespan ativo."""
+    import httpx
+
+    app = criar_app_sqlite(caminho_banco)
+    # ASGITransport não dispara o lifespan; é o que encerra o pool de algoritmos
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://carga", timeout=timeout) as cliente:
+            yield cliente
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def cliente_uvicorn(caminho_banco, timeout, concorrencia, workers=1):
+    """Sobe ``backend.app.main:app`` em um uvicorn local e devolve um cliente HTTP."""
+    import httpx
+
+    porta = _porta_livre()
+    ambiente = dict(os.environ, DATABASE_URL=f"sqlite:///{caminho_banco}")
+    ambiente.pop("ASYNC_DATABASE_URL", None)
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--host", "127.0.0.1",
+         "--port", str(porta), "--workers", str(workers), "--log-level", "warning"],
+        env=ambiente,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{porta}", timeout=timeout, limits=limites) as cliente:
+            for _ in range(300):
+                if processo.poll() is not None:
+                    raise RuntimeError(f"uvicorn terminou com código {processo.returncode}")
+                try:
+                    await cliente.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn não respondeu em 30 s")
+            yield cliente
+    finally:
+        processo.terminate()
+        processo.wait(timeout=30)
+
+
+async def executar(args, resultados, pasta):
+    catalogo = gerar(args, args.itens)
+    caminho_banco = os.path.join(pasta, "carga.db")
+    if args.uvicorn:
+        conexao = cliente_uvicorn(caminho_banco, args.timeout, args.concorrencia, args.workers_uvicorn)
+    else:
+        conexao = cliente_asgi(caminho_banco, args.timeout)
+
+    async with conexao as cliente:
+        inicio = time.perf_counter()
+        for carga in cargas_catalogo(catalogo):
+            verificar(await cliente.post("/recipes/bulk", json=carga))
+        print(f"Catálogo de {args.itens} itens importado em {time.perf_counter() - inicio:.1f} s")
+
+        mistura = operacoes(catalogo, args.fracao_escrita, ciclico=args.ciclos > 0)
+        registros = {}
+        inicio_medicao = time.perf_counter() + args.aquecimento
+        fim = inicio_medicao + args.duracao
+        await asyncio.gather(*(
+            _usuario(cliente, mistura, random.Random(args.semente * 1000 + i), inicio_medicao, fim,
+                     registros, args.etag)
+            for i in range(args.concorrencia)
+        ))
+
+    # Vazão pelo tempo real da medição (a última requisição pode passar do fim)
+    duracao = max(args.duracao, time.perf_counter() - inicio_medicao)
+    ordem = [rota for rota, _, _ in mistura]
+    for rota in sorted(registros, key=ordem.index):
+        resultados.medicoes.append(resumo(rota, registros[rota], args.itens, duracao))
+    todas = [amostra for amostras in registros.values() for amostra in amostras]
+    if todas:
+        resultados.medicoes.append(resumo("total", todas, args.itens, duracao))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--itens", type=int, default=10000, help="tamanho do catálogo")
+    argumentos_catalogo(parser)
+    parser.add_argument("--concorrencia", type=int, default=32, help="clientes virtuais simultâneos")
+    parser.add_argument("--duracao", type=float, default=30.0, help="segundos de medição")
+    parser.add_argument("--aquecimento", type=float, default=3.0, help="segundos iniciais descartados")
+    parser.add_argument("--fracao-escrita", type=float, default=0.02,
+                        help="fração das requisições que são escritas (POST /items/, /recipes/)")
+    parser.add_argument("--etag", action="store_true",
+                        help="clientes reenviam o último ETag recebido (If-None-Match)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="timeout por requisição, em segundos")
+    parser.add_argument("--uvicorn", action="store_true", help="servir o app por um uvicorn local")
+    parser.add_argument("--workers-uvicorn", type=int, default=1)
+    parser.add_argument("--histogramas", action="store_true", help="imprimir o histograma de cada rota")
+    parser.add_argument("--limite-erros", type=float, default=None,
+                        help="sai com código 1 se a taxa de erros total passar disso (ex.: 0.01)")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/carga-<commit>.json)")
+    args = parser.parse_args(argv)
+    if not 0 <= args.fracao_escrita <= 1:
+        parser.error("--fracao-escrita deve estar entre 0 e 1")
+
+    resultados = Resultados("carga", vars(args))
+    with tempfile.TemporaryDirectory() as pasta:
+        asyncio.run(executar(args, resultados, pasta))
+    imprimir(resultados.medicoes, args.histogramas)
+    resultados.salvar(args.saida)
+
+    total = next((m for m in resultados.medicoes if m["nome"] == "total"), None)
+    if args.limite_erros is not None and (total is None or total["taxa_erros"] > args.limite_erros):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
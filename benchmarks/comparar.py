@@ -0,0 +1,56 @@
+"""
+Compara dois arquivos de resultados de benchmark (mediana de cada medição).
+
+Uso:
+
+    python -m benchmarks.comparar antes.json depois.json [--limite 1.10]
+
+Medições mais lentas que ``limite`` vezes a anterior são marcadas; o
+código de saída é 1 se houver alguma, para uso em CI.
+"""
+
+import argparse
+import json
+
+
+def _carregar(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        dados = json.load(f)
+    medicoes = {
+        (m["nome"], m["itens"]): m["mediana_s"]
+        for m in dados["medicoes"]
+        if "mediana_s" in m
+    }
+    return dados["ambiente"], medicoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark.")
+    parser.add_argument("antes")
+    parser.add_argument("depois")
+    parser.add_argument("--limite", type=float, default=1.10,
+                        help="razão depois/antes a partir da qual é regressão")
+    args = parser.parse_args(argv)
+
+    ambiente_antes, antes = _carregar(args.antes)
+    ambiente_depois, depois = _carregar(args.depois)
+    print(f"antes:  {ambiente_antes['commit']}  ({ambiente_antes['data']})")
+    print(f"depois: {ambiente_depois['commit']}  ({ambiente_depois['data']})")
+
+    regressoes = 0
+    for chave in sorted(antes.keys() & depois.keys(), key=lambda c: (c[1], c[0])):
+        nome, itens = chave
+        razao = depois[chave] / antes[chave] if antes[chave] else float("inf")
+        marca = ""
+        if razao > args.limite:
+            marca = "  <-- regressão"
+            regressoes += 1
+        print(
+            f"{itens:>9}  {nome:<48} {antes[chave] * 1000:>10.2f} -> "
+            f"{depois[chave] * 1000:>10.2f} ms  x{razao:.2f}{marca}"
+        )
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
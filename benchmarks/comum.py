@@ -0,0 +1,138 @@
+"""
+Medição de tempo e gravação dos resultados em JSON.
+
+Cada arquivo de resultados traz o commit, o ambiente e os parâmetros da
+execução, para que duas execuções possam ser comparadas com
+``python -m benchmarks.comparar antes.json depois.json``.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+
+
+def _git(*args):
+    try:
+        saida = subprocess.run(
+            ["git", *args],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return saida.stdout.strip()
+
+
+def ambiente():
+    """Commit, versão do Python e máquina em que os benchmarks rodaram."""
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "alteracoes_locais": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+class Resultados:
+    """Acumula as medições de uma execução e as grava em JSON."""
+
+    def __init__(self, suite, parametros):
+        self.suite = suite
+        self.parametros = parametros
+        self.medicoes = []
+
+    def medir(self, nome, funcao, itens, repeticoes=3, preparar=None):
+        """
+        Executa ``funcao`` ``repeticoes`` vezes e guarda mín/mediana/máx.
+
+        ``preparar`` roda antes de cada repetição, fora da medição (por
+        exemplo, para descartar caches e medir a execução "a frio").
+        Retorna o valor da última execução.
+        """
+        tempos = []
+        valor = None
+        for _ in range(repeticoes):
+            if preparar is not None:
+                preparar()
+            inicio = time.perf_counter()
+            valor = funcao()
+            tempos.append(time.perf_counter() - inicio)
+        medicao = {
+            "nome": nome,
+            "itens": itens,
+            "repeticoes": repeticoes,
+            "min_s": min(tempos),
+            "mediana_s": statistics.median(tempos),
+            "max_s": max(tempos),
+        }
+        self.medicoes.append(medicao)
+        print(f"{itens:>9} itens  {nome:<48} {medicao['mediana_s'] * 1000:>11.2f} ms")
+        return valor
+
+    def pular(self, nome, itens, motivo):
+        self.medicoes.append({"nome": nome, "itens": itens, "pulado": motivo})
+        print(f"{itens:>9} itens  {nome:<48} {'pulado: ' + motivo:>14}")
+
+    def salvar(self, caminho=None):
+        info = ambiente()
+        if caminho is None:
+            os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+            caminho = os.path.join(PASTA_RESULTADOS, f"{self.suite}-{info['commit'] or 'sem-commit'}.json")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(
+                {"suite": self.suite, "ambiente": info, "parametros": self.parametros, "medicoes": self.medicoes},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"Resultados gravados em {caminho}")
+        return caminho
+
+
+def argumentos_catalogo(parser):
+    """Opções que controlam o formato do catálogo sintético."""
+    parser.add_argument("--profundidade", type=int, default=6)
+    parser.add_argument("--fan-in", type=int, nargs=2, default=[1, 4], metavar=("MIN", "MAX"))
+    parser.add_argument("--concentracao", type=float, default=1.0)
+    parser.add_argument("--receitas-alternativas", type=float, default=0.0,
+                        help="fração de itens craftáveis com uma segunda receita")
+    parser.add_argument("--ciclos", type=int, default=0,
+                        help="receitas extras que fecham ciclos entre camadas")
+    parser.add_argument("--semente", type=int, default=0)
+    return parser
+
+
+def argumentos_comuns(parser):
+    parser.add_argument("--itens", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="tamanhos de catálogo a medir")
+    argumentos_catalogo(parser)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: benchmarks/resultados/<suite>-<commit>.json)")
+    return parser
+
+
+def gerar(args, total_itens, **extras):
+    from crafting.gerador import gerar_catalogo
+
+    return gerar_catalogo(
+        total_itens,
+        profundidade=args.profundidade,
+        fan_in=tuple(args.fan_in),
+        concentracao=args.concentracao,
+        receitas_alternativas=args.receitas_alternativas,
+        ciclos=args.ciclos,
+        semente=args.semente,
+        **extras,
+    )
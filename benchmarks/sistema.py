@@ -0,0 +1,96 @@
+"""
+Benchmarks dos algoritmos do ``SistemaCrafting`` e da ``ListaAdjacencia``.
+
+Uso (na raiz do projeto):
+
+    python -m benchmarks.sistema --itens 1000 10000 100000
+
+Algoritmos que memoizam resultados são medidos a frio: os caches do
+sistema são descartados (e o CSR recompilado) antes de cada repetição.
+"""
+
+import argparse
+import random
+
+from .comum import Resultados, argumentos_comuns, gerar
+
+
+def medir_sistema(resultados, args, total_itens):
+    r = args.repeticoes
+    catalogo = resultados.medir("gerar_catalogo", lambda: gerar(args, total_itens), total_itens, 1)
+    sistema = resultados.medir("construcao (adicionar_item/receita)", catalogo.para_sistema, total_itens, 1)
+
+    def a_frio():
+        sistema._invalidar_caches()
+        sistema.congelar()
+
+    resultados.medir("congelar (CSR)", sistema.congelar, total_itens, r, preparar=sistema._invalidar_caches)
+    sistema.congelar()
+
+    rng = random.Random(args.semente)
+    basicos = catalogo.camadas[0]
+    topo = catalogo.camadas[-1]
+    alvo = rng.choice(topo)
+    inventario = {nome: 1000 for nome in basicos}
+
+    m = lambda nome, funcao, preparar=None: resultados.medir(nome, funcao, total_itens, r, preparar)
+
+    m("bfs_itens_possiveis", lambda: sistema.bfs_itens_possiveis(inventario))
+    m("custos_minimos (todos os itens)", lambda: sistema.custos_minimos(basicos))
+    m("custos_minimos (ponderado)", lambda: sistema.custos_minimos(basicos, ponderado=True))
+    m("dijkstra_custo_minimo (um alvo)", lambda: sistema.dijkstra_custo_minimo(alvo, basicos))
+    m("caminho_crafting", lambda: sistema.caminho_crafting(alvo, basicos))
+    m("caminho_crafting (bidirecional)", lambda: sistema.caminho_crafting(alvo, basicos, bidirecional=True))
+    m("caminhos_alternativos (k=3)", lambda: sistema.caminhos_alternativos(alvo, basicos, k=3))
+    m("plano_custo_minimo", lambda: sistema.plano_custo_minimo(alvo, basicos))
+    # Lista de materiais e ordem topológica só existem sem ciclos (--ciclos 0)
+    aciclico = not sistema.detectar_ciclos()
+    if aciclico:
+        m("lista_materiais (a frio)", lambda: sistema.lista_materiais(alvo, 10), a_frio)
+        m("lista_materiais (memoizada)", lambda: sistema.lista_materiais(alvo, 10))
+        m("quantidade_maxima", lambda: sistema.quantidade_maxima(alvo, inventario), a_frio)
+
+        alvos_lote = catalogo.camadas[-1][:args.alvos_lote]
+        m(f"lista_materiais_lote ({len(alvos_lote)} alvos, a frio)",
+          lambda: sistema.lista_materiais_lote(alvos_lote), a_frio)
+        m(f"lista_materiais ({len(alvos_lote)} alvos, um a um, a frio)",
+          lambda: [sistema.lista_materiais(a) for a in alvos_lote], a_frio)
+
+    m("detectar_ciclos", sistema.detectar_ciclos)
+    if aciclico:
+        m("ordem_topologica", sistema.ordem_topologica)
+    m("componentes_ciclicas (Tarjan)", sistema.componentes_ciclicas)
+    m("dominadores", sistema.dominadores, a_frio)
+
+    indice = m("indice_alcancabilidade (construção)", sistema.indice_alcancabilidade, a_frio)
+    m("alcanca (1000 consultas)", lambda: [indice.alcanca(rng.choice(basicos), alvo) for _ in range(1000)])
+    m("descendentes (um recurso básico)", lambda: indice.descendentes(rng.choice(basicos)))
+    m("ancestrais (apenas básicos)", lambda: indice.ancestrais(alvo, apenas_basicos=True))
+
+    deltas = [{rng.choice(basicos): rng.randint(-5, 5) + 5} for _ in range(1000)]
+    def rastrear():
+        rastreador = sistema.rastreador_craftaveis({nome: 2 for nome in basicos})
+        for delta in deltas:
+            rastreador.aplicar(delta)
+    m("rastreador_craftaveis (criação + 1000 deltas)", rastrear)
+
+    grafo = sistema.grafo_direto
+    m("ListaAdjacencia.exportar_para_dict", grafo.exportar_para_dict)
+    m("ListaAdjacencia graus (todos os vértices)",
+      lambda: [(grafo.grau_entrada(v), grafo.grau_saida(v)) for v in grafo.obter_vertices()])
+
+
+def main(argv=None):
+    parser = argumentos_comuns(argparse.ArgumentParser(description=__doc__.splitlines()[1]))
+    parser.add_argument("--alvos-lote", type=int, default=1000,
+                        help="alvos do benchmark de lista_materiais_lote")
+    args = parser.parse_args(argv)
+
+    resultados = Resultados("sistema", vars(args))
+    for total_itens in args.itens:
+        medir_sistema(resultados, args, total_itens)
+    resultados.salvar(args.saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -48,8 +48,10 @@ def adicionar_receita_cli(sistema: SistemaCrafting):
         print("A receita precisa de pelo menos um ingrediente.")
         return
 
-    sistema.adicionar_receita(ingredientes, resultado, qtd_resultado=qtd_resultado)
+    cria_ciclo = sistema.adicionar_receita(ingredientes, resultado, qtd_resultado=qtd_resultado)
     print(f"Receita para '{resultado}' adicionada.")
+    if cria_ciclo:
+        print("Atenção: esta receita cria uma dependência circular.")
 
 
 def listar_itens_cli(sistema: SistemaCrafting):
@@ -81,21 +83,50 @@ def calcular_bfs_cli(sistema: SistemaCrafting):
             break
         qtd = perguntar_int("  Quantidade", default=1)
         recursos[nome] = qtd
-    possiveis = sistema.bfs_itens_possiveis(recursos)
+    try:
+        rastreador = sistema.rastreador_craftaveis(recursos)
+    except ValueError as e:
+        print(f"Não foi possível calcular: {e}")
+        return
     print("Itens possíveis:")
-    for it in possiveis:
+    for it in sorted(rastreador.possiveis()):
         print(f"- {it}")
 
+    if not perguntar_bool("Acompanhar variações do inventário?"):
+        return
+    print("Variações (ex.: -1 para gastar uma unidade; deixe o nome vazio para terminar):")
+    while True:
+        nome = input("- Item: ").strip()
+        if not nome:
+            break
+        delta = perguntar_int("  Variação")
+        try:
+            ganhos, perdidos = rastreador.aplicar({nome: delta})
+        except ValueError as e:
+            print(f"Variação ignorada: {e}")
+            continue
+        for it in sorted(ganhos):
+            print(f"  + {it}")
+        for it in sorted(perdidos):
+            print(f"  - {it}")
+        if not ganhos and not perdidos:
+            print("  (nenhuma mudança nos itens possíveis)")
+
 
 def calcular_custo_cli(sistema: SistemaCrafting):
-    alvo = input("Item alvo: ").strip()
+    alvos = input("Itens alvo (separados por vírgula): ").strip()
     basicos = input("Recursos básicos (separados por vírgula): ").strip()
+    lista_alvos = [s.strip() for s in alvos.split(",") if s.strip()]
     lista = [s.strip() for s in basicos.split(",") if s.strip()]
-    custo = sistema.dijkstra_custo_minimo(alvo, lista)
-    if custo == float('inf'):
-        print("Impossível craftar com os dados atuais.")
-    else:
-        print(f"Custo mínimo (em etapas): {custo}")
+    ponderado = perguntar_bool("Ponderar pelas quantidades dos ingredientes?")
+    custos = sistema.custos_minimos(lista, lista_alvos, ponderado=ponderado)
+    unidade = "em quantidade" if ponderado else "em etapas"
+    for alvo in lista_alvos:
+        custo = custos[alvo]
+        if custo == float('inf'):
+            print(f"- {alvo}: impossível craftar com os dados atuais.")
+        else:
+            print(f"- {alvo}: custo mínimo ({unidade}) {custo}")
 
 
 def caminho_cli(sistema: SistemaCrafting):
@@ -109,6 +140,39 @@ def caminho_cli(sistema: SistemaCrafting):
         print(" -> ".join(caminho))
 
 
+def lista_materiais_cli(sistema: SistemaCrafting):
+    alvo = input("Item alvo: ").strip()
+    if alvo not in sistema.itens:
+        print("Item não encontrado.")
+        return
+    quantidade = perguntar_int("Quantidade", default=1)
+    try:
+        materiais = sistema.lista_materiais(alvo, quantidade)
+    except ValueError as e:
+        print(f"Não foi possível calcular: {e}")
+        return
+    print(f"Recursos básicos para {quantidade}x {alvo}:")
+    for nome, qtd in sorted(materiais.items()):
+        print(f"- {nome} x{qtd}")
+
+
+def quantidade_maxima_cli(sistema: SistemaCrafting):
+    alvo = input("Item alvo: ").strip()
+    print("Inventário (deixe o nome vazio para terminar):")
+    inventario = {}
+    while True:
+        nome = input("- Item: ").strip()
+        if not nome:
+            break
+        inventario[nome] = perguntar_int("  Quantidade", default=1)
+    try:
+        quantidade = sistema.quantidade_maxima(alvo, inventario)
+    except ValueError as e:
+        print(f"Não foi possível calcular: {e}")
+        return
+    print(f"Dá para craftar {quantidade}x {alvo}.")
+
+
 def menu():
     sistema = SistemaCrafting()
     acoes = {
@@ -122,6 +186,8 @@ def menu():
         "8": ("Plotar grafo (estático)", lambda s: visualizar_grafo(s)),
         "9": ("Plotar grafo (interativo)", lambda s: visualizar_grafo_interativo(s)),
         "A": ("📊 Ver estrutura da Lista de Adjacência", lambda s: s.imprimir_estrutura_grafo()),
+        "B": ("Lista de materiais (BOM)", lista_materiais_cli),
+        "C": ("Quantidade máxima craftável", quantidade_maxima_cli),
         "0": ("Sair", None),
     }
 
@@ -0,0 +1,153 @@
+"""
+Índice de alcançabilidade (fecho transitivo) do grafo de crafting.
+
+Até ``LIMITE_BITSETS`` itens o índice é pré-calculado, nas duas direções:
+cada componente fortemente conexa guarda um bitset com seus descendentes
+e outro com seus ancestrais. Pertinência (``alcanca``) custa O(1) e as
+listagens ("tudo que X pode virar", "tudo de que Y depende", só os
+recursos de base) percorrem os bits ligados, em O(V/8 + saída) sem
+nenhuma busca no grafo. Acima do limite a memória O(V²/8) não compensa:
+o índice não é montado e as consultas viram buscas no CSR a partir do
+item, em O(arestas visitadas), com parada antecipada em ``alcanca``.
+
+As listas saem sempre em ordem alfabética (a ordem dos IDs do CSR).
+"""
+
+from collections import deque
+
+
+# Acima deste número de itens o fecho transitivo em bitsets não é montado
+LIMITE_BITSETS = 10000
+
+
+class IndiceAlcancabilidade:
+    """
+    Alcançabilidade sobre o CSR congelado do sistema, nas duas direções.
+
+    Para grafos de até ``max_itens_bitsets`` itens, o grafo é condensado
+    em componentes fortemente conexas (Tarjan), que saem em ordem
+    topológica inversa. Os descendentes de cada componente são calculados
+    a partir dos das componentes que ela alcança, e os ancestrais na ordem
+    contrária. Cada componente guarda os dois bitsets (inteiros Python),
+    compartilhados pelos seus itens; os recursos de base são uma máscara
+    aplicada aos ancestrais.
+    """
+
+    def __init__(self, sistema, max_itens_bitsets=LIMITE_BITSETS):
+        self._csr = sistema.congelar()
+        indices = self._csr.indices
+
+        # Recursos de base: básicos ou sem receita que os produza
+        self._basicos = {
+            item for item, dados in sistema.itens.items()
+            if dados.eh_basico or not sistema.grafo_inverso.get(item)
+        }
+
+        self._descendentes = None
+        self._ancestrais = None
+        if len(self._csr.nomes) <= max_itens_bitsets:
+            self._mascara_basicos = 0
+            for item in self._basicos:
+                self._mascara_basicos |= 1 << indices[item]
+            self._montar_bitsets(sistema._componentes_fortes())
+
+    @property
+    def usa_bitsets(self):
+        return self._descendentes is not None
+
+    def _montar_bitsets(self, componentes):
+        csr = self._csr
+        self._componente = [0] * len(csr.nomes)
+        membros = []
+        for c, componente in enumerate(componentes):
+            ids = [csr.indices[item] for item in componente]
+            for i in ids:
+                self._componente[i] = c
+            membros.append(ids)
+
+        # Componentes alcançadas saem antes (Tarjan): descendentes já prontos
+        self._descendentes = [0] * len(componentes)
+        for c, ids in enumerate(membros):
+            bits = 0
+            for i in ids:
+                for vizinho in csr.vizinhos(i):
+                    bits |= (1 << vizinho) | self._descendentes[self._componente[vizinho]]
+            self._descendentes[c] = bits
+
+        # Ordem contrária para os ancestrais: quem alcança a componente vem antes
+        self._ancestrais = [0] * len(componentes)
+        for c in range(len(membros) - 1, -1, -1):
+            bits = 0
+            for i in membros[c]:
+                for anterior in csr.antecessores(i):
+                    bits |= (1 << anterior) | self._ancestrais[self._componente[anterior]]
+            self._ancestrais[c] = bits
+
+    def _nomes(self, bits):
+        """Nomes dos itens com o bit ligado, em ordem de ID (alfabética)."""
+        nomes = self._csr.nomes
+        saida = []
+        dados = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        for posicao, byte in enumerate(dados):
+            base = posicao * 8
+            while byte:
+                menor = byte & -byte
+                saida.append(nomes[base + menor.bit_length() - 1])
+                byte ^= menor
+        return saida
+
+    def _busca(self, origem, vizinhos, destino=None):
+        """Índices alcançados a partir de ``origem`` (sem ela, salvo em ciclo)."""
+        vistos = set()
+        fila = deque([origem])
+        while fila:
+            for vizinho in vizinhos(fila.popleft()):
+                if vizinho not in vistos:
+                    if vizinho == destino:
+                        return True
+                    vistos.add(vizinho)
+                    fila.append(vizinho)
+        return False if destino is not None else vistos
+
+    def contem(self, item):
+        return item in self._csr.indices
+
+    def alcanca(self, origem, destino):
+        """Indica se ``origem`` pode, por alguma cadeia de receitas, virar ``destino``."""
+        indices = self._csr.indices
+        if origem not in indices or destino not in indices:
+            return False
+        i, j = indices[origem], indices[destino]
+        if self._descendentes is not None:
+            return bool(self._descendentes[self._componente[i]] >> j & 1)
+        return self._busca(i, self._csr.vizinhos, destino=j)
+
+    def descendentes(self, item):
+        """Tudo que ``item`` pode eventualmente se tornar, em ordem alfabética."""
+        i = self._csr.indices.get(item)
+        if i is None:
+            return []
+        if self._descendentes is not None:
+            return self._nomes(self._descendentes[self._componente[i]])
+        nomes = self._csr.nomes
+        return [nomes[j] for j in sorted(self._busca(i, self._csr.vizinhos))]
+
+    def ancestrais(self, item, apenas_basicos=False):
+        """
+        Tudo de que ``item`` depende, em ordem alfabética. Com
+        ``apenas_basicos``, só os recursos de base (itens básicos ou sem
+        receita).
+        """
+        i = self._csr.indices.get(item)
+        if i is None:
+            return []
+        if self._ancestrais is not None:
+            bits = self._ancestrais[self._componente[i]]
+            if apenas_basicos:
+                bits &= self._mascara_basicos
+            return self._nomes(bits)
+        nomes = self._csr.nomes
+        resultado = [nomes[j] for j in sorted(self._busca(i, self._csr.antecessores))]
+        if apenas_basicos:
+            resultado = [nome for nome in resultado if nome in self._basicos]
+        return resultado
@@ -0,0 +1,265 @@
+"""
+Sistema de crafting somente leitura sobre vetores planos.
+
+``vetores(sistema)`` achata um ``SistemaCrafting`` em vetores ``array``:
+o CSR nas duas direções (com pesos), a tabela de nomes, as receitas e os
+índices de usos e de receitas por resultado, todos por ID inteiro de item.
+``SistemaCongelado`` roda os mesmos algoritmos diretamente sobre esses
+vetores (ou sobre ``memoryview`` de memória compartilhada), sem refazer
+dicionários de itens, objetos ``Receita`` ou a Lista de Adjacência: itens
+e receitas são montados sob demanda, só quando um algoritmo os acessa.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+
+from .csr import GrafoCSR
+from .models import ItemCrafting, Receita
+from .system import SistemaCrafting
+
+
+def _por_item(total, pares, tipo_valor=None):
+    """
+    Agrupa ``(id do item, valor)`` por item em formato CSR, mantendo a
+    ordem de chegada dentro de cada item. Retorna ``(offsets, valores)``
+    ou, com ``tipo_valor``, ``(offsets, valores, extras)`` para pares
+    ``(id, (valor, extra))``.
+    """
+    contagem = [0] * (total + 1)
+    for i, _ in pares:
+        contagem[i + 1] += 1
+    offsets = array('q', [0]) * (total + 1)
+    for i in range(total):
+        offsets[i + 1] = offsets[i] + contagem[i + 1]
+    posicao = array('q', offsets[:total])
+    valores = array('i', [0]) * len(pares)
+    extras = array(tipo_valor, [0]) * len(pares) if tipo_valor else None
+    for i, valor in pares:
+        if extras is not None:
+            valor, extra = valor
+            extras[posicao[i]] = extra
+        valores[posicao[i]] = valor
+        posicao[i] += 1
+    return (offsets, valores, extras) if extras is not None else (offsets, valores)
+
+
+def vetores(sistema):
+    """Vetores planos que descrevem o sistema (ver ``SistemaCongelado``)."""
+    csr = sistema.congelar()
+    nomes = csr.nomes
+    indices = csr.indices
+    total = len(nomes)
+
+    texto = bytearray()
+    fim_nomes = array('q')
+    for nome in nomes:
+        texto += nome.encode('utf-8')
+        fim_nomes.append(len(texto))
+
+    receitas = sistema.receitas
+    quantidades = [qtd for r in receitas for _, qtd in r.ingredientes]
+    quantidades += [r.quantidade_resultado for r in receitas]
+    tipo = 'q' if all(isinstance(q, int) for q in quantidades) else 'd'
+
+    fim_ingredientes = array('q')
+    ingredientes = array('i')
+    qtd_ingredientes = array(tipo)
+    usos = []
+    for r, receita in enumerate(receitas):
+        for item, qtd in receita.ingredientes:
+            ingredientes.append(indices[item])
+            qtd_ingredientes.append(qtd)
+            usos.append((indices[item], (r, qtd)))
+        fim_ingredientes.append(len(ingredientes))
+
+    usos_offsets, usos_receitas, usos_qtd = _por_item(total, usos, tipo)
+    produz_offsets, produz_receitas = _por_item(
+        total, [(indices[r.resultado], i) for i, r in enumerate(receitas)]
+    )
+
+    secoes = {
+        'nomes': array('B', bytes(texto)),
+        'fim_nomes': fim_nomes,
+        # Ordem de cadastro dos itens e flag de básico, por ID do CSR
+        'ordem_itens': array('i', (indices[nome] for nome in sistema.itens)),
+        'basicos': array('B', (sistema.itens[nome].eh_basico for nome in nomes)),
+        'tem_ciclo': array('B', [sistema.detectar_ciclos()]),
+        'offsets': csr.offsets,
+        'alvos': csr.alvos,
+        'offsets_inv': csr.offsets_inv,
+        'alvos_inv': csr.alvos_inv,
+        'receita_resultado': array('i', (indices[r.resultado] for r in receitas)),
+        'receita_qtd': array(tipo, (r.quantidade_resultado for r in receitas)),
+        'fim_ingredientes': fim_ingredientes,
+        'ingredientes': ingredientes,
+        'qtd_ingredientes': qtd_ingredientes,
+        'usos_offsets': usos_offsets,
+        'usos_receitas': usos_receitas,
+        'usos_qtd': usos_qtd,
+        'produz_offsets': produz_offsets,
+        'produz_receitas': produz_receitas,
+    }
+    if csr.pesos is not None:
+        secoes['pesos'] = csr.pesos
+    if sistema._ordem is not None:
+        secoes['ordem'] = array('q', (sistema._ordem[nome] for nome in nomes))
+    return secoes
+
+
+# --- Visões sob demanda --------------------------------------------------------
+
+class _Itens(Mapping):
+    """``nome -> ItemCrafting``, na ordem de cadastro."""
+
+    def __init__(self, csr, basicos, ordem):
+        self._csr = csr
+        self._basicos = basicos
+        self._ordem = ordem
+
+    def __getitem__(self, nome):
+        return ItemCrafting(nome, bool(self._basicos[self._csr.indices[nome]]))
+
+    def __contains__(self, nome):
+        return nome in self._csr.indices
+
+    def __iter__(self):
+        nomes = self._csr.nomes
+        return (nomes[i] for i in self._ordem)
+
+    def __len__(self):
+        return len(self._ordem)
+
+
+class _Receitas(Sequence):
+    """Receitas por índice, montadas a partir dos vetores a cada acesso."""
+
+    def __init__(self, nomes, v):
+        self._nomes = nomes
+        self._resultado = v['receita_resultado']
+        self._lote = v['receita_qtd']
+        self._fim = v['fim_ingredientes']
+        self._ingredientes = v['ingredientes']
+        self._quantidades = v['qtd_ingredientes']
+
+    def __len__(self):
+        return len(self._resultado)
+
+    def __getitem__(self, r):
+        if isinstance(r, slice):
+            return [self[i] for i in range(*r.indices(len(self)))]
+        if r < 0:
+            r += len(self)
+        inicio = self._fim[r - 1] if r else 0
+        nomes = self._nomes
+        return Receita(
+            [(nomes[self._ingredientes[k]], self._quantidades[k]) for k in range(inicio, self._fim[r])],
+            nomes[self._resultado[r]],
+            self._lote[r],
+        )
+
+    def __iter__(self):
+        return (self[r] for r in range(len(self)))
+
+
+class _Usos:
+    """``item -> [(índice da receita, quantidade exigida)]``, como ``SistemaCrafting._usos``."""
+
+    def __init__(self, indices, offsets, receitas, quantidades):
+        self._indices = indices
+        self._offsets = offsets
+        self._receitas = receitas
+        self._quantidades = quantidades
+
+    def get(self, nome, padrao=None):
+        i = self._indices.get(nome)
+        if i is None or self._offsets[i] == self._offsets[i + 1]:
+            return padrao
+        faixa = range(self._offsets[i], self._offsets[i + 1])
+        return [(self._receitas[k], self._quantidades[k]) for k in faixa]
+
+
+class _Produtoras:
+    """``item -> receitas que o produzem``, como ``SistemaCrafting.grafo_inverso``."""
+
+    def __init__(self, indices, offsets, indices_receitas, receitas):
+        self._indices = indices
+        self._offsets = offsets
+        self._indices_receitas = indices_receitas
+        self._receitas = receitas
+
+    def get(self, nome, padrao=None):
+        i = self._indices.get(nome)
+        if i is None or self._offsets[i] == self._offsets[i + 1]:
+            return padrao
+        return [self._receitas[self._indices_receitas[k]] for k in range(self._offsets[i], self._offsets[i + 1])]
+
+
+class _Pesos:
+    """``(origem, destino) -> peso``, lido do CSR."""
+
+    def __init__(self, csr):
+        self._csr = csr
+
+    def __getitem__(self, aresta):
+        csr = self._csr
+        i, j = csr.indices[aresta[0]], csr.indices[aresta[1]]
+        for k in range(csr.offsets[i], csr.offsets[i + 1]):
+            if csr.alvos[k] == j:
+                return csr.pesos[k]
+        raise KeyError(aresta)
+
+
+class _Ordem(Mapping):
+    """``nome -> posição`` na ordem topológica."""
+
+    def __init__(self, csr, posicoes):
+        self._csr = csr
+        self._posicoes = posicoes
+
+    def __getitem__(self, nome):
+        return self._posicoes[self._csr.indices[nome]]
+
+    def __iter__(self):
+        return iter(self._csr.nomes)
+
+    def __len__(self):
+        return len(self._csr.nomes)
+
+
+class SistemaCongelado(SistemaCrafting):
+    """
+    ``SistemaCrafting`` somente leitura sobre os vetores de ``vetores()``.
+
+    Os algoritmos são os mesmos do ``SistemaCrafting``; mudam só as
+    estruturas que eles consultam, que aqui são visões sobre os vetores.
+    O que fica em memória por instância é a tabela de nomes (lista e
+    dicionário nome -> ID) e as memoizações dos próprios algoritmos.
+    """
+
+    def __init__(self, v):
+        texto = bytes(v['nomes'])
+        nomes = []
+        inicio = 0
+        for fim in v['fim_nomes']:
+            nomes.append(texto[inicio:fim].decode('utf-8'))
+            inicio = fim
+
+        csr = GrafoCSR(
+            nomes, v['offsets'], v['alvos'], v['offsets_inv'], v['alvos_inv'], v.get('pesos')
+        )
+        self.itens = _Itens(csr, v['basicos'], v['ordem_itens'])
+        self.receitas = _Receitas(nomes, v)
+        self._usos = _Usos(csr.indices, v['usos_offsets'], v['usos_receitas'], v['usos_qtd'])
+        self.grafo_inverso = _Produtoras(csr.indices, v['produz_offsets'], v['produz_receitas'], self.receitas)
+        self.grafo_direto = csr
+        self._pesos = _Pesos(csr)
+        self._tem_ciclo = bool(v['tem_ciclo'][0])
+        self._ordem = _Ordem(csr, v['ordem']) if 'ordem' in v else None
+        self._invalidar_caches()
+        self._csr = csr
+
+    def adicionar_item(self, nome, eh_basico=False):
+        raise RuntimeError("SistemaCongelado é somente leitura")
+
+    def adicionar_receita(self, ingredientes, resultado, qtd_resultado=1):
+        raise RuntimeError("SistemaCongelado é somente leitura")
@@ -0,0 +1,144 @@
+"""
+Representação congelada (CSR) do grafo de crafting.
+
+CSR (Compressed Sparse Row) guarda todas as arestas em um único vetor
+contíguo: os vizinhos do vértice ``i`` ficam em
+``alvos[offsets[i]:offsets[i + 1]]``. Os nomes dos itens são internados
+em IDs inteiros, então cada aresta ocupa 4 bytes em vez de uma referência
+para string dentro de uma lista Python.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class GrafoCSR:
+    """
+    Grafo direcionado imutável em formato CSR, nas duas direções.
+
+    Oferece a mesma interface de leitura da ``ListaAdjacencia``
+    (por nome) e também acesso direto por IDs inteiros, usado pelas
+    travessias que querem evitar a conversão nome -> vértice.
+    """
+
+    def __init__(
+        self,
+        nomes: List[str],
+        offsets: array,
+        alvos: array,
+        offsets_inv: array,
+        alvos_inv: array,
+        pesos: Optional[array] = None,
+    ):
+        self.nomes = nomes
+        self.indices: Dict[str, int] = {nome: i for i, nome in enumerate(nomes)}
+        self.offsets = offsets
+        self.alvos = alvos
+        self.offsets_inv = offsets_inv
+        self.alvos_inv = alvos_inv
+        self.pesos = pesos
+
+    @classmethod
+    def de_adjacencias(
+        cls,
+        vertices: Iterable[str],
+        adjacentes,
+        pesos: Optional[Dict[Tuple[str, str], float]] = None,
+    ) -> "GrafoCSR":
+        """
+        Compila o grafo a partir dos vértices e de uma função
+        ``adjacentes(vertice) -> lista de vizinhos``. Se ``pesos`` for
+        dado, o peso de cada aresta é guardado alinhado a ``alvos``.
+        """
+        nomes = sorted(vertices)
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        n = len(nomes)
+
+        offsets = array('q', [0]) * (n + 1)
+        alvos = array('i')
+        vetor_pesos = None
+        if pesos is not None:
+            inteiros = all(isinstance(p, int) for p in pesos.values())
+            vetor_pesos = array('q' if inteiros else 'd')
+        grau_entrada = [0] * n
+
+        for i, nome in enumerate(nomes):
+            for vizinho in adjacentes(nome):
+                j = indices[vizinho]
+                alvos.append(j)
+                grau_entrada[j] += 1
+                if vetor_pesos is not None:
+                    vetor_pesos.append(pesos[(nome, vizinho)])
+            offsets[i + 1] = len(alvos)
+
+        # Direção inversa: contagem por destino seguida de preenchimento
+        offsets_inv = array('q', [0]) * (n + 1)
+        for j in range(n):
+            offsets_inv[j + 1] = offsets_inv[j] + grau_entrada[j]
+        alvos_inv = array('i', [0]) * len(alvos)
+        posicao = array('q', offsets_inv[:n])
+        for i in range(n):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = alvos[k]
+                alvos_inv[posicao[j]] = i
+                posicao[j] += 1
+
+        return cls(nomes, offsets, alvos, offsets_inv, alvos_inv, vetor_pesos)
+
+    # --- Acesso por ID ---------------------------------------------------
+
+    def num_vertices(self) -> int:
+        return len(self.nomes)
+
+    def indice(self, vertice: str) -> int:
+        return self.indices[vertice]
+
+    def vizinhos(self, i: int) -> array:
+        """IDs dos vértices adjacentes ao vértice ``i``."""
+        return self.alvos[self.offsets[i]:self.offsets[i + 1]]
+
+    def pesos_vizinhos(self, i: int) -> array:
+        """Pesos das arestas de ``i``, alinhados com ``vizinhos(i)``."""
+        return self.pesos[self.offsets[i]:self.offsets[i + 1]]
+
+    def antecessores(self, i: int) -> array:
+        """IDs dos vértices com aresta chegando ao vértice ``i``."""
+        return self.alvos_inv[self.offsets_inv[i]:self.offsets_inv[i + 1]]
+
+    # --- Interface compatível com ListaAdjacencia ------------------------
+
+    def obter_adjacentes(self, vertice: str) -> List[str]:
+        i = self.indices.get(vertice)
+        if i is None:
+            return []
+        return [self.nomes[j] for j in self.vizinhos(i)]
+
+    def obter_predecessores(self, vertice: str) -> List[str]:
+        i = self.indices.get(vertice)
+        if i is None:
+            return []
+        return [self.nomes[j] for j in self.antecessores(i)]
+
+    def obter_vertices(self) -> Set[str]:
+        return set(self.nomes)
+
+    def tem_aresta(self, origem: str, destino: str) -> bool:
+        i = self.indices.get(origem)
+        j = self.indices.get(destino)
+        if i is None or j is None:
+            return False
+        return j in self.vizinhos(i)
+
+    def grau_saida(self, vertice: str) -> int:
+        i = self.indices.get(vertice)
+        return 0 if i is None else self.offsets[i + 1] - self.offsets[i]
+
+    def grau_entrada(self, vertice: str) -> int:
+        i = self.indices.get(vertice)
+        return 0 if i is None else self.offsets_inv[i + 1] - self.offsets_inv[i]
+
+    def total_arestas(self) -> int:
+        return len(self.alvos)
+
+    def exportar_para_dict(self) -> Dict[str, List[str]]:
+        return {nome: self.obter_adjacentes(nome) for nome in self.nomes}
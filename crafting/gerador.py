@@ -0,0 +1,159 @@
+"""
+Gerador de catálogos sintéticos de receitas, no estilo Minecraft.
+
+Os itens são organizados em camadas: a camada 0 tem os recursos básicos e
+cada receita da camada c usa ingredientes das camadas anteriores. Com a
+mesma semente o catálogo gerado é sempre o mesmo, o que permite comparar
+benchmarks entre commits.
+
+O catálogo usa o mesmo formato de ``crud.create_recipes_bulk`` (e do
+endpoint ``POST /recipes/bulk``):
+
+- ``itens``: lista de (nome, eh_basico)
+- ``receitas``: lista de (resultado, quantidade_resultado, [(ingrediente, quantidade)])
+"""
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+from .system import SistemaCrafting
+
+
+# Prefixo do nome de cada camada (a última se repete nas mais profundas)
+PREFIXOS = ["Recurso", "Material", "Componente", "Peça", "Ferramenta", "Equipamento", "Artefato"]
+
+
+class Catalogo:
+    """Itens e receitas gerados, com a camada de cada item."""
+
+    def __init__(self, itens, receitas, camadas):
+        self.itens = itens
+        self.receitas = receitas
+        self.camadas = camadas  # lista de listas de nomes, da base ao topo
+
+    def para_sistema(self):
+        """Carrega o catálogo em um novo ``SistemaCrafting``."""
+        sistema = SistemaCrafting()
+        for nome, eh_basico in self.itens:
+            sistema.adicionar_item(nome, eh_basico=eh_basico)
+        for resultado, qtd_resultado, ingredientes in self.receitas:
+            sistema.adicionar_receita(ingredientes, resultado, qtd_resultado)
+        return sistema
+
+    def para_json(self):
+        """Corpo de ``POST /recipes/bulk``."""
+        return {
+            "itens": [{"nome": nome, "eh_basico": eh_basico} for nome, eh_basico in self.itens],
+            "receitas": [
+                {
+                    "resultado_nome": resultado,
+                    "quantidade_resultado": qtd_resultado,
+                    "ingredientes": [{"item_nome": nome, "quantidade": qtd} for nome, qtd in ingredientes],
+                }
+                for resultado, qtd_resultado, ingredientes in self.receitas
+            ],
+        }
+
+
+def gerar_catalogo(
+    total_itens=1000,
+    profundidade=6,
+    fracao_basicos=0.05,
+    fan_in=(1, 4),
+    alcance=2,
+    concentracao=1.0,
+    quantidades=(1, 4),
+    lotes=(1, 1, 1, 2, 4),
+    receitas_alternativas=0.0,
+    ciclos=0,
+    semente=0,
+):
+    """
+    Gera um DAG de receitas em camadas.
+
+    - ``total_itens``: número de itens (de 1 mil a 1 milhão, ou mais).
+    - ``profundidade``: número de camadas além da de recursos básicos
+      (pelo menos 1).
+    - ``fracao_basicos``: fração dos itens que são recursos básicos.
+    - ``fan_in``: (mín, máx) de ingredientes distintos por receita.
+    - ``alcance``: de quantas camadas anteriores vêm os ingredientes.
+    - ``concentracao``: expoente Zipf na escolha dos ingredientes; 0 dá
+      fan-out uniforme, valores maiores criam itens muito reutilizados.
+    - ``quantidades``: (mín, máx) da quantidade de cada ingrediente.
+    - ``lotes``: valores sorteados para ``quantidade_resultado``.
+    - ``receitas_alternativas``: probabilidade de um item ganhar uma
+      segunda receita.
+    - ``ciclos``: receitas extras que fecham ciclos: um item intermediário
+      passa a ser produzido a partir de um dos itens que dependem dele.
+    """
+    if profundidade < 1:
+        raise ValueError("profundidade deve ser pelo menos 1")
+
+    rng = random.Random(semente)
+    total_basicos = max(1, int(total_itens * fracao_basicos))
+    restantes = max(0, total_itens - total_basicos)
+
+    # Camadas craftáveis do mesmo tamanho (as primeiras recebem a sobra)
+    tamanhos = [restantes // profundidade] * profundidade
+    for c in range(restantes - sum(tamanhos)):
+        tamanhos[c % profundidade] += 1
+
+    camadas = [[f"{PREFIXOS[0]} {i}" for i in range(total_basicos)]]
+    for c, tamanho in enumerate(tamanhos, start=1):
+        prefixo = PREFIXOS[min(c, len(PREFIXOS) - 1)]
+        camadas.append([f"{prefixo} {c}.{i}" for i in range(tamanho)])
+
+    itens = [(nome, True) for nome in camadas[0]]
+    itens += [(nome, False) for camada in camadas[1:] for nome in camada]
+
+    # Pesos Zipf por posição, calculados uma vez para o maior candidato
+    maior = max(
+        (sum(len(camadas[j]) for j in range(max(0, c - alcance), c)) for c in range(1, len(camadas))),
+        default=0,
+    )
+    pesos = list(accumulate(1.0 / (k + 1) ** concentracao for k in range(maior)))
+
+    def sortear(candidatos, k):
+        total = len(candidatos)
+        limite = pesos[total - 1]
+        # dict em vez de set: ordem determinística para a mesma semente
+        escolhidos = {}
+        # Amostra sem repetição; desiste após poucas tentativas extras
+        for _ in range(4 * k):
+            escolhidos[candidatos[bisect_right(pesos, rng.random() * limite, 0, total)]] = None
+            if len(escolhidos) == k:
+                break
+        return list(escolhidos)
+
+    def receita(resultado, candidatos):
+        k = min(rng.randint(*fan_in), len(candidatos))
+        ingredientes = [(nome, rng.randint(*quantidades)) for nome in sortear(candidatos, k)]
+        return (resultado, rng.choice(lotes), ingredientes)
+
+    receitas = []
+    for c in range(1, len(camadas)):
+        candidatos = [nome for j in range(max(0, c - alcance), c) for nome in camadas[j]]
+        # Embaralha uma vez por camada: os itens populares não são sempre os primeiros
+        rng.shuffle(candidatos)
+        for resultado in camadas[c]:
+            receitas.append(receita(resultado, candidatos))
+            if receitas_alternativas and rng.random() < receitas_alternativas:
+                receitas.append(receita(resultado, candidatos))
+
+    if ciclos and len(camadas) > 2:
+        usado_por = {}
+        for resultado, _, ingredientes in receitas:
+            for nome, _ in ingredientes:
+                usado_por.setdefault(nome, []).append(resultado)
+        intermediarios = [nome for camada in camadas[1:-1] for nome in camada if nome in usado_por]
+        for _ in range(ciclos if intermediarios else 0):
+            # Sobe por uma cadeia de consumidores e fecha o ciclo no início dela
+            inicio = atual = rng.choice(intermediarios)
+            for _ in range(rng.randint(1, profundidade)):
+                if atual not in usado_por:
+                    break
+                atual = rng.choice(usado_por[atual])
+            receitas.append((inicio, 1, [(atual, 1)]))
+
+    return Catalogo(itens, receitas, camadas)
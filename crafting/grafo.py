@@ -3,9 +3,11 @@ Implementação de Grafo usando Lista de Adjacência
 Estrutura de dados requisitada para o trabalho acadêmico.
 """
 
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from collections import defaultdict
 
+from .csr import GrafoCSR
+
 
 class ListaAdjacencia:
     """
@@ -28,15 +30,24 @@ class ListaAdjacencia:
         A estrutura interna usa um dicionário onde:
         - Chave: vértice (nome do item)
         - Valor: lista de vértices adjacentes (itens que podem ser craftados)
+        
+        Também mantém a lista inversa (predecessores) e os contadores de
+        grau, atualizados a cada aresta inserida.
         """
         self._adjacencias: Dict[str, List[str]] = defaultdict(list)
+        self._predecessores: Dict[str, List[str]] = defaultdict(list)
+        self._grau_entrada: Dict[str, int] = defaultdict(int)
         self._vertices: Set[str] = set()
+        self._arestas: Set[Tuple[str, str]] = set()
+        self._total_arestas = 0
     
     def adicionar_vertice(self, vertice: str) -> None:
         """Adiciona um vértice ao grafo."""
         self._vertices.add(vertice)
         if vertice not in self._adjacencias:
             self._adjacencias[vertice] = []
+            self._predecessores[vertice] = []
+            self._grau_entrada[vertice] = 0
     
     def adicionar_aresta(self, origem: str, destino: str) -> None:
         """
@@ -47,8 +58,12 @@ class ListaAdjacencia:
         self.adicionar_vertice(origem)
         self.adicionar_vertice(destino)
         
-        if destino not in self._adjacencias[origem]:
+        if (origem, destino) not in self._arestas:
+            self._arestas.add((origem, destino))
             self._adjacencias[origem].append(destino)
+            self._predecessores[destino].append(origem)
+            self._grau_entrada[destino] += 1
+            self._total_arestas += 1
     
     def obter_adjacentes(self, vertice: str) -> List[str]:
         """
@@ -57,13 +72,20 @@ class ListaAdjacencia:
         """
         return self._adjacencias.get(vertice, [])
     
+    def obter_predecessores(self, vertice: str) -> List[str]:
+        """
+        Retorna os vértices com aresta chegando ao vértice dado.
+        No contexto de crafting: os itens usados para craftá-lo.
+        """
+        return self._predecessores.get(vertice, [])
+    
     def obter_vertices(self) -> Set[str]:
         """Retorna todos os vértices do grafo."""
         return self._vertices.copy()
     
     def tem_aresta(self, origem: str, destino: str) -> bool:
         """Verifica se existe uma aresta entre origem e destino."""
-        return destino in self._adjacencias.get(origem, [])
+        return (origem, destino) in self._arestas
     
     def grau_saida(self, vertice: str) -> int:
         """Retorna o grau de saída do vértice (número de arestas saindo)."""
@@ -71,11 +93,11 @@ class ListaAdjacencia:
     
     def grau_entrada(self, vertice: str) -> int:
         """Retorna o grau de entrada do vértice (número de arestas chegando)."""
-        grau = 0
-        for adj_list in self._adjacencias.values():
-            if vertice in adj_list:
-                grau += 1
-        return grau
+        return self._grau_entrada.get(vertice, 0)
+    
+    def total_arestas(self) -> int:
+        """Retorna o número de arestas do grafo."""
+        return self._total_arestas
     
     def imprimir_estrutura(self) -> None:
         """
@@ -91,8 +113,7 @@ class ListaAdjacencia:
             print(f"{vertice:15} -> {adjacentes}")
         
         print(f"\nTotal de vértices: {len(self._vertices)}")
-        total_arestas = sum(len(adj) for adj in self._adjacencias.values())
-        print(f"Total de arestas: {total_arestas}")
+        print(f"Total de arestas: {self._total_arestas}")
         print("=" * 45)
     
     def exportar_para_dict(self) -> Dict[str, List[str]]:
@@ -100,4 +121,13 @@ class ListaAdjacencia:
         Exporta a Lista de Adjacência como um dicionário Python.
         Útil para serialização e compatibilidade com código existente.
         """
-        return dict(self._adjacencias)
\ No newline at end of file
+        return dict(self._adjacencias)
+    
+    def congelar(self, pesos: Optional[Dict[Tuple[str, str], float]] = None) -> GrafoCSR:
+        """
+        Compila a Lista de Adjacência em um GrafoCSR imutável.
+        
+        Os nomes viram IDs inteiros e as arestas das duas direções ficam
+        em vetores contíguos (``array``), ocupando bem menos memória.
+        """
+        return GrafoCSR.de_adjacencias(self._vertices, self.obter_adjacentes, pesos)
@@ -0,0 +1,194 @@
+"""
+Rastreamento incremental dos itens possíveis a partir de um inventário.
+
+Em vez de recalcular tudo a cada mudança de inventário (como faz
+``bfs_itens_possiveis``), o rastreador mantém, para cada receita, quantos
+ingredientes ainda não estão atendidos e o conjunto de itens craftados.
+Uma variação no estoque só visita as receitas afetadas e, em cadeia, as
+que usam os itens que passaram a ser (ou deixaram de ser) craftáveis.
+"""
+
+
+class RastreadorCraftaveis:
+    """
+    Itens possíveis (os de ``bfs_itens_possiveis``) mantidos sob variações
+    de inventário.
+
+    Mesma semântica da BFS: um ingrediente está atendido quando o
+    inventário tem a quantidade pedida pela receita ou quando o item já é
+    craftável (itens craftados ficam disponíveis em quantidade ilimitada),
+    e uma receita dispara quando todos os ingredientes estão atendidos.
+    Itens do inventário só contam com quantidade positiva: um delta que
+    zera o estoque remove o item do inventário.
+
+    Ganhos se propagam como na BFS. Perdas usam remoção e rederivação:
+    os itens cuja produção dependia do que saiu são removidos em cadeia e
+    depois readmitidos se ainda houver uma receita pronta para eles (pelo
+    ``grafo_inverso``). Assim ciclos de receitas que só se sustentavam um
+    no outro não ficam craftáveis por engano. Cada delta custa O(receitas
+    e itens afetados), não O(grafo).
+
+    Se o sistema ganhar novas receitas (ou for trocado por
+    ``trocar_sistema``), os contadores são reconstruídos na próxima
+    chamada a ``aplicar``.
+    """
+
+    def __init__(self, sistema, inventario=None):
+        self._sistema = sistema
+        self.inventario = {item: qtd for item, qtd in (inventario or {}).items() if qtd}
+        for item, qtd in self.inventario.items():
+            if qtd < 0:
+                raise ValueError(f"Inventário negativo para '{item}'")
+        self._reconstruir()
+
+    def _reconstruir(self):
+        sistema = self._sistema
+        self._total_receitas = len(sistema.receitas)
+        self._faltando = [len(receita.ingredientes) for receita in sistema.receitas]
+        self._craftados = set()
+
+        fila = []
+        for item, qtd in self.inventario.items():
+            self._atender(item, 0, qtd, fila)
+        self._propagar_ganhos(fila, {})
+
+    def trocar_sistema(self, sistema):
+        """Passa a acompanhar outro sistema (por exemplo, um snapshot mais novo)."""
+        self._sistema = sistema
+        self._total_receitas = None
+
+    def possiveis(self):
+        """Itens do inventário e todos os que podem ser craftados a partir dele."""
+        return set(self.inventario) | self._craftados
+
+    def craftaveis(self):
+        """Itens que podem ser craftados agora, diretamente ou em cadeia."""
+        return set(self._craftados)
+
+    def eh_craftavel(self, item):
+        return item in self._craftados
+
+    def _eh_possivel(self, item):
+        return item in self.inventario or item in self._craftados
+
+    # --- Contadores ---------------------------------------------------------
+
+    def _atender(self, item, antes, depois, fila):
+        """Ingredientes de ``item`` atendidos ao passar de ``antes`` para ``depois`` unidades."""
+        receitas = self._sistema.receitas
+        for indice, qtd in self._sistema._usos.get(item, ()):
+            if antes < qtd <= depois:
+                self._faltando[indice] -= 1
+                if self._faltando[indice] == 0:
+                    fila.append(receitas[indice].resultado)
+
+    def _desatender(self, item, antes, depois, fila):
+        """Ingredientes de ``item`` que deixam de ser atendidos de ``antes`` para ``depois`` unidades."""
+        receitas = self._sistema.receitas
+        for indice, qtd in self._sistema._usos.get(item, ()):
+            if depois < qtd <= antes:
+                if self._faltando[indice] == 0:
+                    fila.append(receitas[indice].resultado)
+                self._faltando[indice] += 1
+
+    def _propagar_ganhos(self, fila, anteriores):
+        while fila:
+            item = fila.pop()
+            if item in self._craftados:
+                continue
+            anteriores.setdefault(item, self._eh_possivel(item))
+            self._craftados.add(item)
+            # Craftado: disponível sem limite, além do que há no inventário
+            self._atender(item, self.inventario.get(item, 0), float('inf'), fila)
+
+    def _remover_em_cadeia(self, fila, anteriores):
+        removidos = []
+        while fila:
+            item = fila.pop()
+            if item not in self._craftados:
+                continue
+            anteriores.setdefault(item, self._eh_possivel(item))
+            self._craftados.discard(item)
+            removidos.append(item)
+            self._desatender(item, float('inf'), self.inventario.get(item, 0), fila)
+        return removidos
+
+    def _tem_receita_pronta(self, item):
+        craftados = self._craftados
+        inventario = self.inventario
+        return any(
+            receita.ingredientes and all(
+                ingrediente in craftados or inventario.get(ingrediente, 0) >= qtd
+                for ingrediente, qtd in receita.ingredientes
+            )
+            for receita in self._sistema.grafo_inverso.get(item, ())
+        )
+
+    # --- Variações de inventário -------------------------------------------
+
+    def aplicar(self, deltas):
+        """
+        Aplica variações de inventário (``{"Ferro": 3, "Madeira": -1}``).
+
+        Retorna ``(ganhos, perdidos)``: os itens que entraram e os que
+        saíram de ``possiveis()``. Um item que entra e sai dentro do mesmo
+        lote não aparece em nenhum dos dois. Levanta ValueError, sem
+        alterar nada, se algum estoque ficaria negativo.
+        """
+        for item, delta in deltas.items():
+            if self.inventario.get(item, 0) + delta < 0:
+                raise ValueError(f"Inventário negativo para '{item}'")
+
+        if len(self._sistema.receitas) != self._total_receitas:
+            antes = self.possiveis()
+            for item, delta in deltas.items():
+                self._somar(item, delta)
+            self._reconstruir()
+            depois = self.possiveis()
+            return depois - antes, antes - depois
+
+        anteriores = {}
+
+        # 1. Reduções: remove em cadeia tudo cuja produção pode ter caído
+        fila = []
+        for item, delta in deltas.items():
+            if delta < 0:
+                anteriores.setdefault(item, self._eh_possivel(item))
+                antes = self.inventario.get(item, 0)
+                depois = self._somar(item, delta)
+                if item not in self._craftados:
+                    self._desatender(item, antes, depois, fila)
+                elif any(depois < qtd <= antes for _, qtd in self._sistema._usos.get(item, ())):
+                    # Ainda atendido por ser craftado, mas a receita que o
+                    # produz pode depender justamente desse estoque
+                    fila.append(item)
+        removidos = self._remover_em_cadeia(fila, anteriores)
+
+        # 2. Aumentos, e rederivação dos removidos que ainda têm receita pronta
+        fila = [item for item in removidos if self._tem_receita_pronta(item)]
+        for item, delta in deltas.items():
+            if delta > 0:
+                anteriores.setdefault(item, self._eh_possivel(item))
+                antes = self.inventario.get(item, 0)
+                depois = self._somar(item, delta)
+                if item not in self._craftados:
+                    self._atender(item, antes, depois, fila)
+        self._propagar_ganhos(fila, anteriores)
+
+        ganhos = set()
+        perdidos = set()
+        for item, era in anteriores.items():
+            e = self._eh_possivel(item)
+            if e and not era:
+                ganhos.add(item)
+            elif era and not e:
+                perdidos.add(item)
+        return ganhos, perdidos
+
+    def _somar(self, item, delta):
+        atual = self.inventario.get(item, 0) + delta
+        if atual:
+            self.inventario[item] = atual
+        else:
+            self.inventario.pop(item, None)
+        return atual
@@ -1,7 +1,10 @@
+import heapq
 from collections import deque, defaultdict
 
 from .models import ItemCrafting, Receita
 from .grafo import ListaAdjacencia
+from .alcance import IndiceAlcancabilidade
+from .rastreador import RastreadorCraftaveis
 
 
 class SistemaCrafting:
@@ -23,13 +26,47 @@ class SistemaCrafting:
         self.grafo_direto = ListaAdjacencia()    # item -> itens que podem ser craftados
         self.grafo_inverso = defaultdict(list)   # item -> receitas que o produzem
         
-        # Para fins acadêmicos, mantemos também uma versão mais simples:
-        self._adjacencias_simples = defaultdict(list)  # Backup da estrutura básica
+        # Índice de usos: item -> [(índice da receita, quantidade exigida)]
+        self._usos = defaultdict(list)
+
+        # Peso de cada aresta (ingrediente, resultado): menor quantidade
+        # do ingrediente entre as receitas que a originam
+        self._pesos = {}
+
+        # Versão congelada (CSR) do grafo; descartada a cada alteração
+        self._csr = None
+
+        # Memoização da lista de materiais (BOM); descartada a cada alteração
+        self._ordens_bom = {}   # item -> itens do sub-grafo em ordem topológica
+        self._vetores_bom = {}  # item -> materiais por unidade, ou False se houver lotes
+        self._planos_bom = {}   # item -> itens a expandir (sub-grafo cortado nos lineares)
+
+        # Índice de alcançabilidade; descartado a cada alteração
+        self._alcance = None
+
+        # Árvores de dominadores por conjunto de recursos básicos
+        self._dominadores = {}
+
+        # Ordem topológica da condensação mantida online (Pearce–Kelly):
+        # componente fortemente conexa (pelo seu representante) -> posição.
+        # Itens de componentes com mais de um item apontam para o
+        # representante; componentes de um item só não aparecem nesses índices.
+        self._posicao = {}
+        self._proxima_posicao = 0
+        self._componente = {}   # item -> representante da sua componente
+        self._membros = {}      # representante -> itens da componente
+        # Ordem topológica dos itens (a própria _posicao enquanto não há
+        # ciclo); quando o grafo passa a ter ciclo ela deixa de existir (None)
+        self._ordem = self._posicao
+        self._tem_ciclo = False
 
     def adicionar_item(self, nome, eh_basico=False):
         """Adiciona um item ao sistema e ao grafo (Lista de Adjacência)."""
         if nome not in self.itens:
+            self._invalidar_caches()
             self.itens[nome] = ItemCrafting(nome, eh_basico)
+            self._posicao[nome] = self._proxima_posicao
+            self._proxima_posicao += 1
             # Adiciona o vértice na Lista de Adjacência
             self.grafo_direto.adicionar_vertice(nome)
 
@@ -38,155 +75,1147 @@ class SistemaCrafting:
         Adiciona uma receita e atualiza a Lista de Adjacência.
         
         Para cada ingrediente -> resultado, cria uma aresta na Lista de Adjacência.
+        Retorna True se a receita criou uma dependência circular.
         """
         # Garante que todos os itens existem
         for item, _ in ingredientes:
             self.adicionar_item(item)
         self.adicionar_item(resultado)
 
+        self._invalidar_caches()
         receita = Receita(ingredientes, resultado, qtd_resultado)
+        indice = len(self.receitas)
         self.receitas.append(receita)
 
+        for item, qtd in ingredientes:
+            self._usos[item].append((indice, qtd))
+
         # Atualiza o grafo inverso (para busca de receitas)
         self.grafo_inverso[resultado].append(receita)
 
         # ATUALIZA A LISTA DE ADJACÊNCIA
         # Adiciona arestas: cada ingrediente pode levar ao resultado
-        for item, _ in ingredientes:
-            self.grafo_direto.adicionar_aresta(item, resultado)
-            # Backup na estrutura simples
-            if resultado not in self._adjacencias_simples[item]:
-                self._adjacencias_simples[item].append(resultado)
+        cria_ciclo = False
+        for item, qtd in ingredientes:
+            if not self.grafo_direto.tem_aresta(item, resultado):
+                self.grafo_direto.adicionar_aresta(item, resultado)
+                cria_ciclo = self._verificar_aresta(item, resultado) or cria_ciclo
+            aresta = (item, resultado)
+            self._pesos[aresta] = min(self._pesos.get(aresta, qtd), qtd)
+
+        return cria_ciclo
+
+    def _verificar_aresta(self, origem, destino):
+        """
+        Atualiza a ordem topológica da condensação após inserir
+        origem -> destino (algoritmo de Pearce–Kelly) e diz se a aresta
+        fechou um ciclo.
+
+        Só a região afetada é visitada: componentes alcançáveis a partir da
+        de ``destino`` com posição até a de ``origem`` e componentes que
+        alcançam a de ``origem`` com posição a partir da de ``destino``.
+        Se a aresta fecha um ciclo, as componentes nas duas buscas são
+        fundidas em uma só e a ordem continua valendo para a condensação,
+        então inserções em grafos já cíclicos também só visitam a região
+        afetada.
+        """
+        a = self._componente.get(origem, origem)
+        b = self._componente.get(destino, destino)
+        if a == b:
+            # Laço no próprio item ou aresta dentro de uma componente cíclica
+            self._marcar_ciclo()
+            return True
+
+        posicao = self._posicao
+        limite_inferior, limite_superior = posicao[b], posicao[a]
+        if limite_inferior > limite_superior:
+            return False
+
+        grafo = self.grafo_direto
+        frente = self._busca_limitada(
+            b, self._vizinhos_componente(grafo.obter_adjacentes),
+            lambda c: posicao[c] <= limite_superior,
+        )
+        tras = self._busca_limitada(
+            a, self._vizinhos_componente(grafo.obter_predecessores),
+            lambda c: posicao[c] >= limite_inferior,
+        )
+        ciclo = set(frente) & set(tras) if a in frente else set()
+        if ciclo:
+            tras = [c for c in tras if c not in ciclo]
+            frente = [c for c in frente if c not in ciclo]
+
+        # Reaproveita as posições da região afetada: quem alcança a origem
+        # vem antes, depois a componente fundida (se houver) e por fim quem
+        # é alcançado pelo destino. As posições de ``tras`` só diminuem e
+        # as de ``frente`` só aumentam, então arestas para fora da região
+        # continuam respeitadas.
+        tras.sort(key=posicao.__getitem__)
+        frente.sort(key=posicao.__getitem__)
+        posicoes = sorted(posicao[c] for c in tras + frente + list(ciclo))
+        for indice, componente in enumerate(tras):
+            posicao[componente] = posicoes[indice]
+        for indice, componente in enumerate(reversed(frente), 1):
+            posicao[componente] = posicoes[-indice]
+        if not ciclo:
+            return False
+
+        representante = self._fundir(ciclo)
+        posicao[representante] = posicoes[len(tras)]
+        self._marcar_ciclo()
+        return True
+
+    def _vizinhos_componente(self, adjacentes):
+        """Vizinhança na condensação, a partir da vizinhança dos itens."""
+        componente = self._componente
+        membros = self._membros
+
+        def vizinhos(representante):
+            for membro in membros.get(representante, (representante,)):
+                for vizinho in adjacentes(membro):
+                    yield componente.get(vizinho, vizinho)
+
+        return vizinhos
+
+    def _fundir(self, componentes):
+        """Funde componentes em uma só (a maior vira representante) e retorna o representante."""
+        membros = self._membros
+        representante = max(componentes, key=lambda c: (len(membros.get(c, (c,))), c))
+        fundida = membros.setdefault(representante, [representante])
+        for componente in componentes:
+            if componente == representante:
+                continue
+            for membro in membros.pop(componente, [componente]):
+                self._componente[membro] = representante
+                fundida.append(membro)
+            del self._posicao[componente]
+        self._componente[representante] = representante
+        return representante
+
+    def _marcar_ciclo(self):
+        self._tem_ciclo = True
+        self._ordem = None
+
+    @staticmethod
+    def _busca_limitada(inicio, vizinhos, dentro):
+        """DFS iterativa a partir de ``inicio`` restrita aos vértices em que ``dentro`` é verdadeiro."""
+        visitados = {inicio}
+        pilha = [inicio]
+        while pilha:
+            atual = pilha.pop()
+            for vizinho in vizinhos(atual):
+                if vizinho not in visitados and dentro(vizinho):
+                    visitados.add(vizinho)
+                    pilha.append(vizinho)
+        return list(visitados)
+
+    def _invalidar_caches(self):
+        """Descarta as estruturas derivadas do grafo (CSR, memos da BOM)."""
+        self._csr = None
+        self._ordens_bom = {}
+        self._vetores_bom = {}
+        self._planos_bom = {}
+        self._alcance = None
+        self._dominadores = {}
+
+    def congelar(self):
+        """
+        Compila o grafo atual em um GrafoCSR (IDs inteiros e vetores
+        contíguos nas duas direções, com os pesos das arestas).
+
+        Enquanto o sistema não for alterado, as travessias passam a usar
+        essa versão. Qualquer novo item ou receita descarta o CSR.
+        """
+        if self._csr is None:
+            self._csr = self.grafo_direto.congelar(self._pesos)
+        return self._csr
+
+    def _grafo(self):
+        """Grafo usado pelas travessias: o CSR, se congelado."""
+        return self._csr if self._csr is not None else self.grafo_direto
 
     def bfs_itens_possiveis(self, recursos_iniciais):
         """
-        Busca em Largura (BFS) usando a Lista de Adjacência.
-        
-        Demonstra o uso prático da Lista de Adjacência para explorar
-        todos os itens que podem ser craftados a partir dos recursos iniciais.
+        Busca em Largura (BFS) por propagação de contadores.
+
+        Cada receita guarda quantos ingredientes ainda faltam; quando um
+        item fica disponível, só as receitas que o usam são atualizadas e
+        a receita "dispara" quando o contador chega a zero. Itens criados
+        passam a estar disponíveis em quantidade ilimitada, inclusive os
+        que já estavam no inventário em quantidade menor. Um item do
+        inventário só conta como disponível com quantidade positiva:
+        entradas com 0 (ou menos) são ignoradas, como se não existissem.
+        Custo: O(V + total de ingredientes) por consulta.
+
+        Para acompanhar um inventário que muda, use
+        ``rastreador_craftaveis``, que mantém o mesmo resultado por deltas.
         """
+        faltando = [len(receita.ingredientes) for receita in self.receitas]
+        itens_criados = {item for item, qtd in recursos_iniciais.items() if qtd > 0}
+        craftados = set()
         fila = deque()
-        recursos_disponiveis = recursos_iniciais.copy()
-        itens_criados = set(recursos_iniciais.keys())
 
-        for item in recursos_iniciais:
-            fila.append(item)
+        def liberar(item, antes, depois):
+            # Ingredientes atendidos ao passar de ``antes`` para ``depois`` unidades
+            for indice, qtd in self._usos.get(item, ()):
+                if antes < qtd <= depois:
+                    faltando[indice] -= 1
+                    if faltando[indice] == 0:
+                        resultado = self.receitas[indice].resultado
+                        if resultado not in craftados:
+                            craftados.add(resultado)
+                            itens_criados.add(resultado)
+                            fila.append(resultado)
 
-        while fila:
-            item_atual = fila.popleft()
+        for item, quantidade in recursos_iniciais.items():
+            liberar(item, 0, quantidade)
 
-            # USA A LISTA DE ADJACÊNCIA para obter itens craftáveis
-            for proximo_item in self.grafo_direto.obter_adjacentes(item_atual):
-                if proximo_item not in itens_criados:
-                    if self._pode_craftar(proximo_item, recursos_disponiveis):
-                        itens_criados.add(proximo_item)
-                        fila.append(proximo_item)
-                        recursos_disponiveis[proximo_item] = float('inf')
+        while fila:
+            item = fila.popleft()
+            liberar(item, max(recursos_iniciais.get(item, 0), 0), float('inf'))
 
         return list(itens_criados)
 
-    def _pode_craftar(self, item, recursos):
-        for receita in self.grafo_inverso[item]:
-            pode_fazer = True
-            for ingrediente, qtd in receita.ingredientes:
-                if ingrediente not in recursos or recursos[ingrediente] < qtd:
-                    pode_fazer = False
-                    break
-            if pode_fazer:
-                return True
-        return False
-
-    def dijkstra_custo_minimo(self, item_alvo, recursos_basicos):
+    def dijkstra_custo_minimo(self, item_alvo, recursos_basicos, ponderado=False, custo_base=None):
         """
         Algoritmo de Dijkstra usando a Lista de Adjacência.
         
         Demonstra como a Lista de Adjacência facilita a exploração
         de vizinhos para calcular distâncias mínimas.
         """
-        distancia = {item: float('inf') for item in self.itens}
+        custos = self.custos_minimos(
+            recursos_basicos, [item_alvo], ponderado=ponderado, custo_base=custo_base
+        )
+        return custos[item_alvo]
+
+    def custos_minimos(self, recursos_basicos, itens_alvo=None, ponderado=False, custo_base=None):
+        """
+        Dijkstra com fila de prioridade (heap): O(E log V).
+
+        Calcula em uma única execução o custo mínimo de vários itens alvo
+        (todos os itens, se ``itens_alvo`` for None). A busca termina assim
+        que todos os alvos são fixados.
+
+        - ``ponderado``: cada aresta custa a quantidade do ingrediente na
+          receita (em vez de 1 por etapa).
+        - ``custo_base``: custo inicial de cada recurso básico (padrão 0).
+        """
+        custo_base = custo_base or {}
+        if self._csr is not None:
+            return self._custos_minimos_csr(recursos_basicos, itens_alvo, ponderado, custo_base)
+
+        distancia = {}
+        heap = []
 
         for recurso in recursos_basicos:
-            distancia[recurso] = 0
+            inicial = custo_base.get(recurso, 0)
+            if inicial < distancia.get(recurso, float('inf')):
+                distancia[recurso] = inicial
+                heapq.heappush(heap, (inicial, recurso))
 
+        pendentes = set(itens_alvo) if itens_alvo is not None else None
         visitados = set()
 
-        while len(visitados) < len(self.itens):
-            min_dist = float('inf')
-            min_item = None
+        while heap:
+            dist_atual, item = heapq.heappop(heap)
+            if item in visitados:
+                continue
+            visitados.add(item)
 
-            for item in self.itens:
-                if item not in visitados and distancia[item] < min_dist:
-                    min_dist = distancia[item]
-                    min_item = item
+            if pendentes is not None:
+                pendentes.discard(item)
+                if not pendentes:
+                    break
 
-            if min_item is None:
+            # USA A LISTA DE ADJACÊNCIA para obter vizinhos
+            for vizinho in self.grafo_direto.obter_adjacentes(item):
+                peso = self._pesos[(item, vizinho)] if ponderado else 1
+                nova_distancia = dist_atual + peso
+                if nova_distancia < distancia.get(vizinho, float('inf')):
+                    distancia[vizinho] = nova_distancia
+                    heapq.heappush(heap, (nova_distancia, vizinho))
+
+        alvos = itens_alvo if itens_alvo is not None else self.itens
+        return {alvo: distancia.get(alvo, float('inf')) for alvo in alvos}
+
+    def _custos_minimos_csr(self, recursos_basicos, itens_alvo, ponderado, custo_base):
+        """Mesmo Dijkstra de ``custos_minimos``, sobre os IDs do GrafoCSR."""
+        csr = self._csr
+        infinito = float('inf')
+        distancia = [infinito] * csr.num_vertices()
+        externos = {}  # recursos fora do grafo não têm ID
+        heap = []
+
+        for recurso in recursos_basicos:
+            inicial = custo_base.get(recurso, 0)
+            i = csr.indices.get(recurso)
+            if i is None:
+                externos[recurso] = min(externos.get(recurso, infinito), inicial)
+            elif inicial < distancia[i]:
+                distancia[i] = inicial
+                heapq.heappush(heap, (inicial, i))
+
+        pendentes = None
+        if itens_alvo is not None:
+            pendentes = {csr.indices[a] for a in itens_alvo if a in csr.indices}
+        visitados = bytearray(csr.num_vertices())
+
+        while heap and (pendentes is None or pendentes):
+            dist_atual, i = heapq.heappop(heap)
+            if visitados[i]:
+                continue
+            visitados[i] = 1
+            if pendentes is not None:
+                pendentes.discard(i)
+
+            inicio, fim = csr.offsets[i], csr.offsets[i + 1]
+            for k in range(inicio, fim):
+                j = csr.alvos[k]
+                nova_distancia = dist_atual + (csr.pesos[k] if ponderado else 1)
+                if nova_distancia < distancia[j]:
+                    distancia[j] = nova_distancia
+                    heapq.heappush(heap, (nova_distancia, j))
+
+        def custo(alvo):
+            i = csr.indices.get(alvo)
+            return distancia[i] if i is not None else externos.get(alvo, infinito)
+
+        alvos = itens_alvo if itens_alvo is not None else self.itens
+        return {alvo: custo(alvo) for alvo in alvos}
+
+    def plano_custo_minimo(self, item_alvo, recursos_basicos, ponderado=True, custo_base=None, custo_receita=1):
+        """
+        Plano de crafting mais barato sobre o hipergrafo de receitas
+        (generalização de Dijkstra por Knuth).
+
+        Diferente de ``custos_minimos``, uma receita só pode ser usada
+        quando TODOS os seus ingredientes já têm custo: o custo da receita
+        é ``custo_receita`` + a soma dos custos dos ingredientes
+        (multiplicados pela quantidade, se ``ponderado``), e cada item fica
+        com a sua receita mais barata. Custo: O(total de ingredientes · log V).
+
+        Retorna ``(custo, plano)``, onde ``plano`` mapeia cada item a
+        craftar para a Receita escolhida, com os ingredientes antes dos
+        itens que os usam. Se o alvo for inalcançável: ``(inf, None)``.
+        """
+        custo_base = custo_base or {}
+        custo = {}
+        escolha = {}
+        heap = []
+        for recurso in recursos_basicos:
+            inicial = custo_base.get(recurso, 0)
+            if inicial < custo.get(recurso, float('inf')):
+                custo[recurso] = inicial
+                heapq.heappush(heap, (inicial, recurso))
+
+        faltando = [len(receita.ingredientes) for receita in self.receitas]
+        soma = [0] * len(self.receitas)
+        fixados = set()
+
+        while heap:
+            custo_atual, item = heapq.heappop(heap)
+            if item in fixados:
+                continue
+            fixados.add(item)
+            if item == item_alvo:
                 break
 
-            visitados.add(min_item)
+            for indice, qtd in self._usos.get(item, ()):
+                faltando[indice] -= 1
+                soma[indice] += custo_atual * (qtd if ponderado else 1)
+                if faltando[indice] == 0:
+                    resultado = self.receitas[indice].resultado
+                    candidato = custo_receita + soma[indice]
+                    if resultado not in fixados and candidato < custo.get(resultado, float('inf')):
+                        custo[resultado] = candidato
+                        escolha[resultado] = indice
+                        heapq.heappush(heap, (candidato, resultado))
 
-            # USA A LISTA DE ADJACÊNCIA para obter vizinhos
-            for vizinho in self.grafo_direto.obter_adjacentes(min_item):
-                nova_distancia = distancia[min_item] + 1
-                if nova_distancia < distancia[vizinho]:
-                    distancia[vizinho] = nova_distancia
+        if item_alvo not in fixados:
+            return float('inf'), None
 
-        return distancia.get(item_alvo, float('inf'))
+        # Monta o plano em pós-ordem: ingredientes antes de quem os usa
+        plano = {}
+        pilha = [(item_alvo, False)]
+        while pilha:
+            item, expandido = pilha.pop()
+            if item in plano or item not in escolha:
+                continue
+            receita = self.receitas[escolha[item]]
+            if expandido:
+                plano[item] = receita
+                continue
+            pilha.append((item, True))
+            for ingrediente, _ in receita.ingredientes:
+                pilha.append((ingrediente, False))
 
-    def caminho_crafting(self, item_alvo, recursos_basicos):
-        if item_alvo in recursos_basicos:
-            return []
+        return custo[item_alvo], plano
+
+    def _receita_escolhida(self, item):
+        """Receita usada para produzir o item (a primeira cadastrada), ou None se for básico."""
+        if item in self.itens and self.itens[item].eh_basico:
+            return None
+        receitas = self.grafo_inverso.get(item)
+        return receitas[0] if receitas else None
+
+    def _ordem_bom(self, item_alvo):
+        """
+        Itens do sub-grafo de ``item_alvo`` em ordem topológica (quem
+        consome vem antes de quem é consumido). Memoizado por item.
+        """
+        ordem = self._ordens_bom.get(item_alvo)
+        if ordem is not None:
+            return ordem
+
+        def ingredientes(item):
+            receita = self._receita_escolhida(item)
+            return iter([ing for ing, _ in receita.ingredientes] if receita else [])
+
+        estado = {item_alvo: 'cinza'}
+        pos_ordem = []
+        pilha = [(item_alvo, ingredientes(item_alvo))]
+        while pilha:
+            item, pendentes = pilha[-1]
+            for ingrediente in pendentes:
+                cor = estado.get(ingrediente)
+                if cor is None:
+                    estado[ingrediente] = 'cinza'
+                    pilha.append((ingrediente, ingredientes(ingrediente)))
+                    break
+                if cor == 'cinza':
+                    raise ValueError(f"Receitas de '{item_alvo}' formam um ciclo em '{ingrediente}'")
+            else:
+                pilha.pop()
+                estado[item] = 'preto'
+                pos_ordem.append(item)
+
+        ordem = pos_ordem[::-1]
+        self._ordens_bom[item_alvo] = ordem
+        return ordem
+
+    def _vetor_linear(self, item_alvo):
+        """
+        Materiais por unidade de ``item_alvo`` quando nenhuma receita do
+        seu sub-grafo produz mais de uma unidade (a BOM é linear na
+        quantidade), ou False caso contrário. Memoizado por item e montado
+        a partir dos vetores dos ingredientes, que também ficam na memória:
+        alvos que compartilham sub-grafos reaproveitam o trabalho.
+        """
+        vetores = self._vetores_bom
+        if item_alvo in vetores:
+            return vetores[item_alvo]
+
+        def ingredientes(item):
+            receita = self._receita_escolhida(item)
+            return iter([ing for ing, _ in receita.ingredientes] if receita else [])
+
+        em_aberto = {item_alvo}
+        pilha = [(item_alvo, ingredientes(item_alvo))]
+        while pilha:
+            item, pendentes = pilha[-1]
+            for ingrediente in pendentes:
+                if ingrediente in vetores:
+                    continue
+                if ingrediente in em_aberto:
+                    raise ValueError(f"Receitas de '{item_alvo}' formam um ciclo em '{ingrediente}'")
+                em_aberto.add(ingrediente)
+                pilha.append((ingrediente, ingredientes(ingrediente)))
+                break
+            else:
+                pilha.pop()
+                em_aberto.discard(item)
+                receita = self._receita_escolhida(item)
+                if receita is None:
+                    vetor = {item: 1}
+                elif receita.quantidade_resultado != 1 or any(
+                    vetores[ing] is False for ing, _ in receita.ingredientes
+                ):
+                    vetor = False
+                else:
+                    vetor = {}
+                    for ingrediente, qtd in receita.ingredientes:
+                        for material, por_unidade in vetores[ingrediente].items():
+                            vetor[material] = vetor.get(material, 0) + qtd * por_unidade
+                vetores[item] = vetor
+        return vetores[item_alvo]
+
+    def _plano_bom(self, item_alvo):
+        """
+        Itens que a expansão da BOM precisa visitar, em ordem topológica:
+        o sub-grafo de ``item_alvo`` cortado nos itens lineares (ver
+        ``_vetor_linear``), que entram como folhas com o vetor por unidade.
+        Memoizado por item.
+        """
+        plano = self._planos_bom.get(item_alvo)
+        if plano is not None:
+            return plano
+
+        def ingredientes(item):
+            if self._vetor_linear(item) is not False:
+                return iter(())
+            return iter([ing for ing, _ in self._receita_escolhida(item).ingredientes])
 
-        fila = deque([(item_alvo, [item_alvo])])
         visitados = {item_alvo}
+        pos_ordem = []
+        pilha = [(item_alvo, ingredientes(item_alvo))]
+        while pilha:
+            item, pendentes = pilha[-1]
+            for ingrediente in pendentes:
+                if ingrediente not in visitados:
+                    visitados.add(ingrediente)
+                    pilha.append((ingrediente, ingredientes(ingrediente)))
+                    break
+            else:
+                pilha.pop()
+                pos_ordem.append(item)
+
+        # _vetor_linear já rejeitou ciclos: a pós-ordem invertida é topológica
+        plano = [(item, self._vetor_linear(item), self._receita_escolhida(item)) for item in reversed(pos_ordem)]
+        self._planos_bom[item_alvo] = plano
+        return plano
+
+    def _expandir_bom(self, item_alvo, quantidade):
+        """Propaga a demanda em ordem topológica, arredondando os lotes para cima."""
+        demanda = {item_alvo: quantidade}
+        materiais = {}
+        for item, vetor, receita in self._plano_bom(item_alvo):
+            necessario = demanda.pop(item, 0)
+            if necessario <= 0:
+                continue
+            if vetor is not False:
+                # Sub-grafo sem lotes: a demanda de um item linear pode ser
+                # somada por partes, sem mudar o arredondamento de ninguém
+                for material, por_unidade in vetor.items():
+                    materiais[material] = materiais.get(material, 0) + necessario * por_unidade
+                continue
+            lotes = self._lotes(item, receita, necessario)
+            for ingrediente, qtd in receita.ingredientes:
+                if qtd > 0:
+                    demanda[ingrediente] = demanda.get(ingrediente, 0) + lotes * qtd
+        return materiais
+
+    @staticmethod
+    def _lotes(item, receita, necessario):
+        """Lotes da receita de ``item`` para ``necessario`` unidades, arredondados para cima."""
+        if receita.quantidade_resultado <= 0:
+            raise ValueError(
+                f"Receita de '{item}' rende {receita.quantidade_resultado} unidades por lote"
+            )
+        return -(-necessario // receita.quantidade_resultado)
+
+    def lista_materiais(self, item_alvo, quantidade=1):
+        """
+        Lista de materiais (BOM): quanto de cada recurso básico é preciso
+        para produzir ``quantidade`` unidades de ``item_alvo``.
+
+        Percorre o DAG de receitas em ordem topológica, somando toda a
+        demanda de um item antes de expandi-lo, e arredonda para cima o
+        número de lotes de cada receita (``quantidade_resultado``). Itens
+        cujo sub-grafo só tem receitas de uma unidade por lote têm o vetor
+        por unidade memoizado e não são expandidos de novo; para eles (e
+        para alvos assim) a consulta custa O(número de materiais). Receitas
+        com lotes maiores dependem da demanda somada e são expandidas a
+        cada consulta, sobre um plano memoizado por alvo.
+        Itens com várias receitas usam a primeira cadastrada.
+        """
+        if quantidade < 1:
+            raise ValueError("A quantidade deve ser pelo menos 1")
+        vetor = self._vetor_linear(item_alvo)
+        if vetor is False:
+            return self._expandir_bom(item_alvo, quantidade)
+        return {item: qtd * quantidade for item, qtd in vetor.items()}
+
+    def lista_materiais_lote(self, alvos, quantidades=None):
+        """
+        Lista de materiais de vários alvos de uma vez (1 unidade de cada se
+        ``quantidades`` for omitido), na ordem recebida. Mesmo resultado
+        que chamar ``lista_materiais`` alvo a alvo.
+
+        Uma única busca em profundidade cobre a união dos sub-grafos dos
+        alvos (sem descer em itens cujo vetor linear já está memoizado) e
+        dá a ordem topológica. Os vetores por unidade que faltam são
+        calculados nessa ordem, de baixo para cima, uma vez por item. Em
+        seguida uma única passada de cima para baixo propaga a demanda de
+        todos os alvos juntos: cada item guarda a demanda por alvo, itens
+        lineares somam o vetor nos materiais de cada alvo que os pede e os
+        demais arredondam os lotes por alvo, como em ``lista_materiais``.
+        """
+        if quantidades is None:
+            quantidades = [1] * len(alvos)
+        elif len(quantidades) != len(alvos):
+            raise ValueError("alvos e quantidades precisam ter o mesmo tamanho")
+        for alvo, quantidade in zip(alvos, quantidades):
+            if alvo not in self.itens:
+                raise ValueError(f"Item '{alvo}' não existe")
+            if quantidade < 1:
+                raise ValueError("A quantidade deve ser pelo menos 1")
+
+        vetores = self._vetores_bom
+
+        def ingredientes(item):
+            if vetores.get(item, False) is not False:
+                return iter(())
+            receita = self._receita_escolhida(item)
+            return iter([ing for ing, _ in receita.ingredientes] if receita else [])
+
+        # Pós-ordem da união dos sub-grafos: ingredientes antes de quem os consome
+        estado = {}
+        pos_ordem = []
+        for alvo in alvos:
+            if alvo in estado:
+                continue
+            estado[alvo] = 'cinza'
+            pilha = [(alvo, ingredientes(alvo))]
+            while pilha:
+                item, pendentes = pilha[-1]
+                for ingrediente in pendentes:
+                    cor = estado.get(ingrediente)
+                    if cor is None:
+                        estado[ingrediente] = 'cinza'
+                        pilha.append((ingrediente, ingredientes(ingrediente)))
+                        break
+                    if cor == 'cinza':
+                        raise ValueError(f"Receitas de '{alvo}' formam um ciclo em '{ingrediente}'")
+                else:
+                    pilha.pop()
+                    estado[item] = 'preto'
+                    pos_ordem.append(item)
+
+        for item in pos_ordem:
+            if item in vetores:
+                continue
+            receita = self._receita_escolhida(item)
+            if receita is None:
+                vetor = {item: 1}
+            elif receita.quantidade_resultado != 1 or any(
+                vetores[ing] is False for ing, _ in receita.ingredientes
+            ):
+                vetor = False
+            else:
+                vetor = {}
+                for ingrediente, qtd in receita.ingredientes:
+                    for material, por_unidade in vetores[ingrediente].items():
+                        vetor[material] = vetor.get(material, 0) + qtd * por_unidade
+            vetores[item] = vetor
+
+        # Demanda por item e por posição do alvo, propagada em ordem topológica
+        materiais = [{} for _ in alvos]
+        demanda = {}
+        for posicao, (alvo, quantidade) in enumerate(zip(alvos, quantidades)):
+            demanda.setdefault(alvo, {})[posicao] = quantidade
+        for item in reversed(pos_ordem):
+            por_alvo = demanda.pop(item, None)
+            if por_alvo is None:
+                continue
+            vetor = vetores[item]
+            if vetor is not False:
+                for posicao, necessario in por_alvo.items():
+                    destino = materiais[posicao]
+                    for material, por_unidade in vetor.items():
+                        destino[material] = destino.get(material, 0) + necessario * por_unidade
+                continue
+            receita = self._receita_escolhida(item)
+            for posicao, necessario in por_alvo.items():
+                lotes = self._lotes(item, receita, necessario)
+                for ingrediente, qtd in receita.ingredientes:
+                    if qtd > 0:
+                        alvo_demanda = demanda.setdefault(ingrediente, {})
+                        alvo_demanda[posicao] = alvo_demanda.get(posicao, 0) + lotes * qtd
+        return materiais
+
+    def quantidade_maxima(self, item_alvo, inventario):
+        """
+        Quantas unidades de ``item_alvo`` dá para craftar com o inventário
+        (``{item: quantidade}``, como em ``bfs_itens_possiveis``).
+
+        Para um N fixo, a viabilidade é verificada propagando a demanda em
+        ordem topológica: cada item usa primeiro o que há no inventário e
+        só o que falta é craftado, em lotes arredondados para cima. Como a
+        demanda de um item é somada antes de expandi-lo, intermediários
+        compartilhados e sobras de lote são contados corretamente. A
+        viabilidade é monótona em N, então o máximo sai de uma busca
+        exponencial seguida de busca binária. Quando o inventário só tem
+        recursos básicos e todo lote rende uma unidade, usa direto o vetor
+        de materiais por unidade. Itens com várias receitas usam a primeira
+        cadastrada, como em ``lista_materiais``. Retorna ``inf`` se o alvo
+        puder ser craftado sem consumir nada. Quantidades negativas no
+        inventário contam como zero, ingredientes com quantidade não
+        positiva não consomem nada e uma receita que rende menos de uma
+        unidade por lote levanta ValueError.
+        """
+        ordem = self._ordem_bom(item_alvo)
+        if self._receita_escolhida(item_alvo) is None:
+            return 0
+
+        vetor = self._vetor_linear(item_alvo)
+        if vetor is not False and not any(
+            inventario.get(item) for item in ordem[1:] if item not in vetor
+        ):
+            limites = [inventario.get(item, 0) // qtd for item, qtd in vetor.items() if qtd > 0]
+            if not limites:
+                return float('inf')
+            return max(0, min(limites))
+
+        if not self._viavel(item_alvo, 1, inventario):
+            return 0
+        alto = 2
+        while self._viavel(item_alvo, alto, inventario):
+            if alto >= 1 << 62:
+                return float('inf')
+            alto *= 2
+
+        baixo = alto // 2  # viável; alto não é
+        while alto - baixo > 1:
+            meio = (baixo + alto) // 2
+            if self._viavel(item_alvo, meio, inventario):
+                baixo = meio
+            else:
+                alto = meio
+        return baixo
+
+    def _viavel(self, item_alvo, quantidade, inventario):
+        """Verifica se o inventário basta para craftar ``quantidade`` unidades."""
+        demanda = {item_alvo: quantidade}
+        for item in self._ordem_bom(item_alvo):
+            necessario = demanda.pop(item, 0)
+            if item != item_alvo:
+                necessario -= min(max(inventario.get(item, 0), 0), necessario)
+            if necessario <= 0:
+                continue
+            receita = self._receita_escolhida(item)
+            if receita is None:
+                return False
+            lotes = self._lotes(item, receita, necessario)
+            for ingrediente, qtd in receita.ingredientes:
+                if qtd > 0:
+                    demanda[ingrediente] = demanda.get(ingrediente, 0) + lotes * qtd
+        return True
+
+    def caminho_crafting(self, item_alvo, recursos_basicos, bidirecional=False):
+        """
+        Menor cadeia de crafting até ``item_alvo``: lista que começa em um
+        item craftável só com recursos básicos e termina no alvo, onde cada
+        item é ingrediente do seguinte.
+
+        A BFS guarda apenas o antecessor de cada item (ponteiros de pai) e
+        reconstrói o caminho ao encontrar a resposta. Com
+        ``bidirecional=True`` a busca avança ao mesmo tempo a partir dos
+        recursos básicos (Lista de Adjacência) e a partir do alvo
+        (ingredientes das receitas), expandindo sempre a menor fronteira.
+        """
+        basicos = set(recursos_basicos)
+        if item_alvo in basicos:
+            return []
+        if bidirecional:
+            return self._caminho_bidirecional(item_alvo, basicos)
+
+        pai = {item_alvo: None}
+        fila = deque([item_alvo])
 
         while fila:
-            item_atual, caminho = fila.popleft()
+            item_atual = fila.popleft()
 
-            for receita in self.grafo_inverso[item_atual]:
+            for receita in self.grafo_inverso.get(item_atual, ()):
                 todos_basicos = True
 
                 for ingrediente, _ in receita.ingredientes:
-                    if ingrediente not in recursos_basicos:
+                    if ingrediente not in basicos:
                         todos_basicos = False
-                        if ingrediente not in visitados:
-                            visitados.add(ingrediente)
-                            fila.append((ingrediente, [ingrediente] + caminho))
+                        if ingrediente not in pai:
+                            pai[ingrediente] = item_atual
+                            fila.append(ingrediente)
 
                 if todos_basicos:
-                    return caminho
+                    return self._seguir_pais(item_atual, pai)
 
         return None
 
+    def caminhos_alternativos(self, item_alvo, recursos_basicos, k=3, ponderado=False):
+        """
+        As ``k`` melhores cadeias de crafting até ``item_alvo``, em ordem
+        de custo (algoritmo de Yen).
+
+        As cadeias têm o mesmo formato de ``caminho_crafting``. Cada etapa
+        custa 1 ou, com ``ponderado``, a quantidade do ingrediente; o
+        primeiro item custa o mesmo que sua receita de recursos básicos.
+        Uma árvore de caminhos mínimos até o alvo é calculada uma única
+        vez e serve de heurística exata (A*) para todas as buscas de
+        desvio, que só exploram o que as remoções de Yen afetaram.
+
+        Retorna uma lista de ``(custo, caminho)``.
+        """
+        basicos = set(recursos_basicos)
+        if k <= 0:
+            return []
+        if item_alvo in basicos:
+            return [(0, [])]
+
+        grafo = self._grafo()
+        sementes = self._sementes_rota(basicos, ponderado)
+
+        def peso(origem, destino):
+            if origem is None:
+                return sementes[destino]
+            return self._pesos[(origem, destino)] if ponderado else 1
+
+        def vizinhos(item):
+            if item is None:
+                return list(sementes)
+            return [v for v in grafo.obter_adjacentes(item) if v not in basicos]
+
+        # Árvore de caminhos mínimos até o alvo (Dijkstra no grafo inverso)
+        ate_alvo = {item_alvo: 0}
+        heap = [(0, item_alvo)]
+        while heap:
+            dist, item = heapq.heappop(heap)
+            if dist > ate_alvo[item]:
+                continue
+            for anterior in grafo.obter_predecessores(item):
+                if anterior in basicos:
+                    continue
+                nova = dist + peso(anterior, item)
+                if nova < ate_alvo.get(anterior, float('inf')):
+                    ate_alvo[anterior] = nova
+                    heapq.heappush(heap, (nova, anterior))
+        ate_alvo[None] = min(
+            (sementes[v] + ate_alvo[v] for v in sementes if v in ate_alvo),
+            default=float('inf'),
+        )
+        if ate_alvo[None] == float('inf'):
+            return []
+
+        def desvio(inicio, nos_removidos, arestas_removidas):
+            """A* de ``inicio`` ao alvo evitando os nós e arestas removidos."""
+            melhor = {inicio: 0}
+            pai = {inicio: None}
+            contador = 0
+            heap = [(ate_alvo[inicio], contador, inicio)]
+            while heap:
+                _, _, item = heapq.heappop(heap)
+                if item == item_alvo:
+                    caminho = [item]
+                    while item != inicio:
+                        item = pai[item]
+                        caminho.append(item)
+                    return melhor[item_alvo], caminho[::-1]
+                for vizinho in vizinhos(item):
+                    if vizinho in nos_removidos or (item, vizinho) in arestas_removidas:
+                        continue
+                    if vizinho not in ate_alvo:
+                        continue
+                    nova = melhor[item] + peso(item, vizinho)
+                    if nova < melhor.get(vizinho, float('inf')):
+                        melhor[vizinho] = nova
+                        pai[vizinho] = item
+                        contador += 1
+                        heapq.heappush(heap, (nova + ate_alvo[vizinho], contador, vizinho))
+            return None
+
+        custo, caminho = desvio(None, set(), set())
+        encontrados = [(custo, caminho)]
+        candidatos = []
+        vistos = {tuple(caminho)}
+        contador = 0
+
+        while len(encontrados) < k:
+            _, anterior = encontrados[-1]
+            custo_raiz = 0
+            for i in range(len(anterior) - 1):
+                raiz = anterior[:i + 1]
+                arestas_removidas = {
+                    (c[i], c[i + 1]) for _, c in encontrados if len(c) > i + 1 and c[:i + 1] == raiz
+                }
+                resultado = desvio(anterior[i], set(raiz[:-1]), arestas_removidas)
+                if resultado is not None:
+                    custo_desvio, trecho = resultado
+                    novo = raiz[:-1] + trecho
+                    if tuple(novo) not in vistos:
+                        vistos.add(tuple(novo))
+                        contador += 1
+                        heapq.heappush(candidatos, (custo_raiz + custo_desvio, contador, novo))
+                custo_raiz += peso(anterior[i], anterior[i + 1])
+
+            if not candidatos:
+                break
+            custo, _, caminho = heapq.heappop(candidatos)
+            encontrados.append((custo, caminho))
+
+        # O nó virtual de origem (None) não faz parte da resposta
+        return [(custo, caminho[1:]) for custo, caminho in encontrados]
+
+    def _sementes_rota(self, basicos, ponderado):
+        """
+        Itens craftáveis diretamente de recursos básicos, com o custo da
+        sua receita mais barata desse tipo (1 por receita, sem ``ponderado``).
+        """
+        sementes = {}
+        verificadas = set()
+        for recurso in basicos:
+            for indice, _ in self._usos.get(recurso, ()):
+                if indice in verificadas:
+                    continue
+                verificadas.add(indice)
+                receita = self.receitas[indice]
+                if receita.resultado in basicos:
+                    continue
+                if all(ing in basicos for ing, _ in receita.ingredientes):
+                    custo = sum(q for _, q in receita.ingredientes) if ponderado else 1
+                    if custo < sementes.get(receita.resultado, float('inf')):
+                        sementes[receita.resultado] = custo
+        return sementes
+
+    @staticmethod
+    def _seguir_pais(inicio, pai):
+        """Caminho de ``inicio`` seguindo os ponteiros de pai até a raiz."""
+        caminho = []
+        item = inicio
+        while item is not None:
+            caminho.append(item)
+            item = pai[item]
+        return caminho
+
+    def _caminho_bidirecional(self, item_alvo, basicos):
+        grafo = self._grafo()
+
+        # Sementes da busca para frente: itens com receita só de básicos
+        pai_frente = dict.fromkeys(self._sementes_rota(basicos, False))
+        dist_frente = dict.fromkeys(pai_frente, 0)
+        pai_tras = {item_alvo: None}
+        dist_tras = {item_alvo: 0}
+
+        def melhor_encontro(novos):
+            encontros = [v for v in novos if v in dist_frente and v in dist_tras]
+            return min(encontros, key=lambda v: dist_frente[v] + dist_tras[v], default=None)
+
+        borda_frente = list(pai_frente)
+        borda_tras = [item_alvo]
+        encontro = melhor_encontro(borda_tras)
+
+        # Expande uma camada inteira por vez, sempre do lado menor; a
+        # primeira camada que toca o outro lado contém um caminho mínimo
+        while encontro is None and borda_frente and borda_tras:
+            if len(borda_frente) <= len(borda_tras):
+                vizinhos, pai, dist, borda = grafo.obter_adjacentes, pai_frente, dist_frente, borda_frente
+            else:
+                vizinhos, pai, dist, borda = grafo.obter_predecessores, pai_tras, dist_tras, borda_tras
+            nova_borda = []
+            for item in borda:
+                for vizinho in vizinhos(item):
+                    if vizinho not in basicos and vizinho not in dist:
+                        dist[vizinho] = dist[item] + 1
+                        pai[vizinho] = item
+                        nova_borda.append(vizinho)
+            if borda is borda_frente:
+                borda_frente = nova_borda
+            else:
+                borda_tras = nova_borda
+            encontro = melhor_encontro(nova_borda)
+
+        if encontro is None:
+            return None
+        inicio = self._seguir_pais(encontro, pai_frente)[::-1]
+        return inicio + self._seguir_pais(pai_tras[encontro], pai_tras)
+
     def detectar_ciclos(self):
         """
-        Detecção de ciclos usando DFS na Lista de Adjacência.
-        
-        Demonstra como a Lista de Adjacência permite navegação
-        eficiente para detectar dependências circulares.
+        Indica se há dependências circulares entre as receitas.
+
+        A ordem topológica é mantida a cada receita adicionada, então a
+        resposta é O(1). Para saber quais itens formam os ciclos, use
+        ``componentes_ciclicas``.
         """
-        cores = {item: 'branco' for item in self.itens}
-        tem_ciclo = False
+        return self._tem_ciclo
 
-        def dfs(item):
-            nonlocal tem_ciclo
-            cores[item] = 'cinza'
+    def ordem_topologica(self):
+        """
+        Itens em ordem topológica (ingredientes antes dos resultados).
+        Lança ValueError se as receitas tiverem ciclo.
+        """
+        if self._ordem is None:
+            raise ValueError("As receitas formam um ciclo; não há ordem topológica")
+        return sorted(self._ordem, key=self._ordem.__getitem__)
 
-            # USA A LISTA DE ADJACÊNCIA para obter vizinhos
-            for vizinho in self.grafo_direto.obter_adjacentes(item):
-                if cores[vizinho] == 'cinza':
-                    tem_ciclo = True
-                    return
-                elif cores[vizinho] == 'branco':
-                    dfs(vizinho)
+    def componentes_ciclicas(self):
+        """
+        Grupos de itens que dependem circularmente uns dos outros.
+
+        Retorna só as componentes fortemente conexas com mais de um item
+        ou com laço no próprio item.
+        """
+        grafo = self._grafo()
+        return [
+            sorted(componente)
+            for componente in self._componentes_fortes()
+            if len(componente) > 1 or grafo.tem_aresta(componente[0], componente[0])
+        ]
+
+    def _componentes_fortes(self):
+        """
+        Todas as componentes fortemente conexas (algoritmo de Tarjan em
+        versão iterativa, sem limite de recursão em cadeias longas).
+
+        As componentes saem em ordem topológica inversa: uma componente só
+        aparece depois de todas as que ela alcança.
+        """
+        grafo = self._grafo()
+        indice = {}
+        menor = {}
+        pilha = []
+        na_pilha = set()
+        componentes = []
 
-            cores[item] = 'preto'
+        for raiz in self.itens:
+            if raiz in indice:
+                continue
+            indice[raiz] = menor[raiz] = len(indice)
+            pilha.append(raiz)
+            na_pilha.add(raiz)
+            trabalho = [(raiz, iter(grafo.obter_adjacentes(raiz)))]
 
-        for item in self.itens:
-            if cores[item] == 'branco':
-                dfs(item)
+            while trabalho:
+                item, vizinhos = trabalho[-1]
+                for vizinho in vizinhos:
+                    if vizinho not in indice:
+                        indice[vizinho] = menor[vizinho] = len(indice)
+                        pilha.append(vizinho)
+                        na_pilha.add(vizinho)
+                        trabalho.append((vizinho, iter(grafo.obter_adjacentes(vizinho))))
+                        break
+                    if vizinho in na_pilha:
+                        menor[item] = min(menor[item], indice[vizinho])
+                else:
+                    trabalho.pop()
+                    if trabalho:
+                        pai = trabalho[-1][0]
+                        menor[pai] = min(menor[pai], menor[item])
+                    if menor[item] == indice[item]:
+                        componente = []
+                        while True:
+                            membro = pilha.pop()
+                            na_pilha.discard(membro)
+                            componente.append(membro)
+                            if membro == item:
+                                break
+                        componentes.append(componente)
 
-        return tem_ciclo
+        return componentes
+
+    def indice_alcancabilidade(self):
+        """
+        Índice de alcançabilidade (fecho transitivo) do grafo atual.
+
+        Construído uma vez e reaproveitado até a próxima alteração do
+        sistema. Congela o grafo (CSR), se ainda não estiver congelado.
+        Ver ``IndiceAlcancabilidade``.
+        """
+        if self._alcance is None:
+            self._alcance = IndiceAlcancabilidade(self)
+        return self._alcance
     
+    def rastreador_craftaveis(self, inventario=None):
+        """
+        Cria um ``RastreadorCraftaveis`` para o inventário dado, que
+        mantém o resultado de ``bfs_itens_possiveis`` sob variações de
+        estoque sem recalcular o grafo inteiro a cada evento.
+        """
+        return RastreadorCraftaveis(self, inventario)
+
+    def dominadores(self, recursos_basicos=None):
+        """
+        Árvore de dominadores do grafo de crafting (algoritmo de
+        Cooper–Harvey–Kennedy), com uma raiz virtual ligada aos recursos
+        básicos (por padrão, os itens marcados como básicos).
+
+        Um item D domina X quando toda cadeia de receitas que parte dos
+        recursos básicos e chega a X passa por D. Retorna um dicionário
+        item -> dominador imediato (None quando só a raiz virtual domina);
+        itens inalcançáveis ficam de fora. O resultado é memoizado até a
+        próxima alteração do sistema.
+        """
+        if recursos_basicos is None:
+            recursos_basicos = [nome for nome, item in self.itens.items() if item.eh_basico]
+        raizes = frozenset(r for r in recursos_basicos if r in self.itens)
+        arvore = self._dominadores.get(raizes)
+        if arvore is None:
+            arvore = self._calcular_dominadores(raizes)
+            self._dominadores[raizes] = arvore
+        return arvore
+
+    def _calcular_dominadores(self, raizes):
+        grafo = self._grafo()
+
+        # Pós-ordem (DFS iterativa) a partir da raiz virtual (None)
+        pos_ordem = []
+        numero = {}
+        visitados = {None}
+        pilha = [(None, iter(sorted(raizes)))]
+        while pilha:
+            item, vizinhos = pilha[-1]
+            for vizinho in vizinhos:
+                if vizinho not in visitados:
+                    visitados.add(vizinho)
+                    pilha.append((vizinho, iter(grafo.obter_adjacentes(vizinho))))
+                    break
+            else:
+                pilha.pop()
+                numero[item] = len(pos_ordem)
+                pos_ordem.append(item)
+
+        idom = {None: None}
+
+        def intersecao(a, b):
+            while a != b:
+                while numero[a] < numero[b]:
+                    a = idom[a]
+                while numero[b] < numero[a]:
+                    b = idom[b]
+            return a
+
+        def antecessores(item):
+            if item in raizes:
+                yield None
+            for anterior in grafo.obter_predecessores(item):
+                if anterior in numero:
+                    yield anterior
+
+        ordem = pos_ordem[-2::-1]  # pós-ordem reversa, sem a raiz virtual
+        mudou = True
+        while mudou:
+            mudou = False
+            for item in ordem:
+                novo = None
+                primeiro = True
+                for anterior in antecessores(item):
+                    if anterior not in idom:
+                        continue
+                    if primeiro:
+                        novo = anterior
+                        primeiro = False
+                    else:
+                        novo = intersecao(anterior, novo)
+                if not primeiro and (item not in idom or idom[item] != novo):
+                    idom[item] = novo
+                    mudou = True
+
+        del idom[None]
+        return idom
+
+    def gargalos(self, item_alvo, recursos_basicos=None):
+        """
+        Itens pelos quais toda cadeia de crafting até ``item_alvo`` passa,
+        do mais próximo ao mais distante (cadeia de dominadores). Retorna
+        None se o alvo não for alcançável a partir dos recursos básicos.
+        """
+        arvore = self.dominadores(recursos_basicos)
+        if item_alvo not in arvore:
+            return None
+        cadeia = []
+        item = arvore[item_alvo]
+        while item is not None:
+            cadeia.append(item)
+            item = arvore[item]
+        return cadeia
+
     def imprimir_estrutura_grafo(self):
         """
         Método para visualizar a Lista de Adjacência.
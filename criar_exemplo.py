@@ -75,27 +75,18 @@ def criar_dados_exemplo():
     
     print("🔧 Criando dados de exemplo para a Lista de Adjacência...")
     
-    # Criar itens
-    for item in itens_basicos + itens_craftaveis:
-        try:
-            response = requests.post(f"{API_BASE}/items/", json=item)
-            if response.status_code == 200:
-                print(f"✅ Item criado: {item['nome']}")
-            else:
-                print(f"⚠️  Item já existe ou erro: {item['nome']}")
-        except Exception as e:
-            print(f"❌ Erro ao criar item {item['nome']}: {e}")
-    
-    # Criar receitas
-    for receita in receitas:
-        try:
-            response = requests.post(f"{API_BASE}/recipes/", json=receita)
-            if response.status_code == 200:
-                print(f"✅ Receita criada: {receita['resultado_nome']}")
-            else:
-                print(f"⚠️  Receita já existe ou erro: {receita['resultado_nome']}")
-        except Exception as e:
-            print(f"❌ Erro ao criar receita {receita['resultado_nome']}: {e}")
+    # Itens e receitas vão em uma única requisição (/recipes/bulk)
+    payload = {"itens": itens_basicos + itens_craftaveis, "receitas": receitas}
+    try:
+        response = requests.post(f"{API_BASE}/recipes/bulk", json=payload)
+        if response.status_code == 200:
+            resultado = response.json()
+            print(f"✅ Itens criados: {resultado['itens_criados']}")
+            print(f"✅ Receitas criadas: {resultado['receitas_criadas']}")
+        else:
+            print(f"⚠️  Erro na importação em lote: {response.status_code} {response.text}")
+    except Exception as e:
+        print(f"❌ Erro ao importar dados de exemplo: {e}")
     
     print("\n🎓 Dados de exemplo criados! Agora você pode:")
     print("1. Abrir o frontend: frontend/index.html")